@@ -0,0 +1,9 @@
+# Standard Library
+import os
+
+# Third Party Library
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+application = get_asgi_application()
@@ -0,0 +1,174 @@
+# Standard Library
+import json
+import pickle
+import zlib
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+# Third Party Library
+from django.conf import settings
+from django.utils.module_loading import import_string
+from gspread_formatting import Color
+
+# Application Library
+from constants import PaperFormat
+
+TAG_PREFIX = "~"
+TUPLE_TAG = "t"
+DICT_TAG = "d"
+
+JSON_HEADER = b"j"
+ZLIB_HEADER = b"z"
+
+cache_serializer = None
+
+TypeCodec = Tuple[Type, str, Callable[[Any], Any], Callable[[Any], Any]]
+type_codecs: List[TypeCodec] = []
+
+
+class SerializationError(ValueError):
+    pass
+
+
+class PickleSerializer:
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class RawSerializer:
+    # django-redis serializer for values that are serialized already.
+    def __init__(self, options: Optional[dict] = None):
+        pass
+
+    def dumps(self, value: bytes) -> bytes:
+        if not isinstance(value, bytes):
+            raise SerializationError("Only bytes can be stored as is")
+        return value
+
+    def loads(self, data: bytes) -> bytes:
+        return data
+
+
+class CompactSerializer:
+    def __init__(
+            self,
+            compress_threshold: Optional[int] = None,
+            compress_level: Optional[int] = None,
+    ):
+        self.compress_threshold = (
+            settings.CACHE_COMPRESS_THRESHOLD
+            if compress_threshold is None else compress_threshold
+        )
+        self.compress_level = (
+            settings.CACHE_COMPRESS_LEVEL
+            if compress_level is None else compress_level
+        )
+        self._encoders: Dict[Type, Tuple[str, Callable]] = {}
+        self._decoders: Dict[str, Callable] = {}
+        for codec in type_codecs:
+            self.register(*codec)
+
+    def register(
+            self,
+            cls: Type,
+            tag: str,
+            encode: Callable[[Any], Any],
+            decode: Callable[[Any], Any],
+    ):
+        self._encoders[cls] = (tag, encode)
+        self._decoders[tag] = decode
+
+    def dumps(self, value: Any) -> bytes:
+        data = json.dumps(
+            self._encode(value), ensure_ascii=False, separators=(",", ":")
+        ).encode()
+        if len(data) >= self.compress_threshold:
+            return ZLIB_HEADER + zlib.compress(data, self.compress_level)
+        return JSON_HEADER + data
+
+    def loads(self, data: bytes) -> Any:
+        header, body = data[:1], data[1:]
+        if header == ZLIB_HEADER:
+            body = zlib.decompress(body)
+        elif header != JSON_HEADER:
+            raise SerializationError("Unknown cache data format")
+        return self._decode(json.loads(body))
+
+    def _encode(self, value: Any) -> Any:
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, list):
+            return [self._encode(item) for item in value]
+        encoder = self._encoders.get(type(value))
+        if encoder is not None:
+            tag, encode = encoder
+            return {TAG_PREFIX + tag: self._encode(encode(value))}
+        if isinstance(value, tuple):
+            return {TAG_PREFIX + TUPLE_TAG: self._encode(list(value))}
+        if isinstance(value, dict):
+            return {TAG_PREFIX + DICT_TAG: [
+                [self._encode(key), self._encode(item)]
+                for key, item in value.items()
+            ]}
+        raise SerializationError(
+            f"Type {type(value).__name__} is not serializable"
+        )
+
+    def _decode(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        (tag, payload), = value.items()
+        payload = self._decode(payload)
+        tag = tag[len(TAG_PREFIX):]
+        if tag == TUPLE_TAG:
+            return tuple(payload)
+        if tag == DICT_TAG:
+            return {key: item for key, item in payload}
+        return self._decoders[tag](payload)
+
+
+def register_type(
+        cls: Type,
+        tag: str,
+        encode: Callable[[Any], Any],
+        decode: Callable[[Any], Any],
+):
+    type_codecs.append((cls, tag, encode, decode))
+    if isinstance(cache_serializer, CompactSerializer):
+        cache_serializer.register(cls, tag, encode, decode)
+
+
+def get_cache_serializer():
+    return cache_serializer or set_cache_serializer()
+
+
+def set_cache_serializer():
+    global cache_serializer
+    cache_serializer = import_string(settings.CACHE_SERIALIZER)()
+    return cache_serializer
+
+
+register_type(
+    Color,
+    "c",
+    lambda color: [getattr(color, name) for name in Color._FIELDS],
+    lambda fields: Color(*fields),
+)
+register_type(
+    PaperFormat,
+    "p",
+    lambda paper_format: paper_format.value,
+    PaperFormat,
+)
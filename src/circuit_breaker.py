@@ -0,0 +1,107 @@
+# Standard Library
+import logging
+from time import time
+from typing import (
+    Dict,
+    Optional,
+)
+
+# Third Party Library
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(settings.PROJECT)
+
+CIRCUIT_CACHE_KEY = "CIRCUIT_{name}_{state}"
+CIRCUIT_WINDOW_CACHE_KEY = "CIRCUIT_{name}_{counter}_{window}"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(
+            self,
+            name: str,
+            error_rate: float,
+            min_requests: int,
+            window: int,
+            open_timeout: int,
+    ):
+        self.name = name
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.open_timeout = open_timeout
+
+    def get_key(self, state: str) -> str:
+        return CIRCUIT_CACHE_KEY.format(name=self.name, state=state)
+
+    def get_window_key(self, counter: str) -> str:
+        return CIRCUIT_WINDOW_CACHE_KEY.format(
+            name=self.name, counter=counter, window=int(time() // self.window)
+        )
+
+    @property
+    def is_open(self) -> bool:
+        return bool(cache.get(self.get_key("OPEN")))
+
+    def before_call(self):
+        # Once the open period is over a single probe call is let through,
+        # everyone else keeps waiting until it decides the state.
+        if self.is_open:
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+        if cache.get(self.get_key("HALF_OPEN")) and not cache.add(
+                self.get_key("PROBE"), 1, self.open_timeout
+        ):
+            raise CircuitOpenError(f"Circuit '{self.name}' is half open")
+
+    def record_success(self):
+        if cache.get(self.get_key("HALF_OPEN")):
+            cache.delete_many([
+                self.get_key("HALF_OPEN"), self.get_key("PROBE")
+            ])
+            logger.info(f"Circuit '{self.name}' closed")
+        self._incr("REQUESTS")
+
+    def record_failure(self):
+        if cache.get(self.get_key("HALF_OPEN")):
+            self.trip()
+            return
+        requests = self._incr("REQUESTS")
+        failures = self._incr("FAILURES")
+        enough_requests = requests >= self.min_requests
+        if enough_requests and failures / requests >= self.error_rate:
+            self.trip()
+
+    def trip(self):
+        cache.set(self.get_key("OPEN"), 1, self.open_timeout)
+        cache.set(self.get_key("HALF_OPEN"), 1, None)
+        cache.delete(self.get_key("PROBE"))
+        logger.warning(
+            f"Circuit '{self.name}' opened for {self.open_timeout} sec"
+        )
+
+    def _incr(self, counter: str) -> int:
+        key = self.get_window_key(counter)
+        cache.add(key, 0, self.window * 2)
+        return cache.incr(key)
+
+
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(
+        name: str,
+        error_rate: float,
+        min_requests: int,
+        window: int,
+        open_timeout: int,
+) -> CircuitBreaker:
+    circuit_breaker: Optional[CircuitBreaker] = circuit_breakers.get(name)
+    if circuit_breaker is None:
+        circuit_breaker = circuit_breakers[name] = CircuitBreaker(
+            name, error_rate, min_requests, window, open_timeout
+        )
+    return circuit_breaker
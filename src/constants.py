@@ -20,6 +20,7 @@ class EventManagerStatus(AutoName):
     IN_PROGRESS = enum.auto()
     SKIP = enum.auto()
     SUCCESS = enum.auto()
+    RETRY = enum.auto()
     ERROR = enum.auto()
 
 
@@ -3,11 +3,31 @@ from django.contrib import admin
 
 # Application Library
 # Register your models here.
-from finder.models import Event
+from finder.models import (
+    ArchivedEvent,
+    Event,
+    OrderAnswer,
+    OutgoingMessage,
+)
 
 
 class EventAdmin(admin.ModelAdmin):
     pass
 
 
+class OutgoingMessageAdmin(admin.ModelAdmin):
+    pass
+
+
+class OrderAnswerAdmin(admin.ModelAdmin):
+    pass
+
+
+class ArchivedEventAdmin(admin.ModelAdmin):
+    pass
+
+
 admin.site.register(Event, EventAdmin)
+admin.site.register(OutgoingMessage, OutgoingMessageAdmin)
+admin.site.register(OrderAnswer, OrderAnswerAdmin)
+admin.site.register(ArchivedEvent, ArchivedEventAdmin)
@@ -0,0 +1,249 @@
+# Standard Library
+import logging
+from dataclasses import (
+    dataclass,
+    field,
+)
+from random import Random
+from threading import Thread
+from time import (
+    perf_counter,
+    sleep,
+    time,
+)
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+# Third Party Library
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from rest_framework.test import APIRequestFactory
+
+# Application Library
+from finder.benchmark.servers import (
+    FakeGoogleServer,
+    FakeTelegramServer,
+    LocalRedirectAdapter,
+)
+from finder.event_logic.worker import (
+    AsyncEventWorker,
+    EventWorker,
+)
+from finder.google_table_logic.client import (
+    SharedAssertionSession,
+    set_gspread_client,
+)
+from finder.google_table_logic.constants import GOOGLE_TOKEN_CACHE_KEY
+from finder.models import (
+    Event,
+    OutgoingMessage,
+)
+from finder.telegram_logic.client import get_telegram_session
+from finder.telegram_logic.dispatcher import MessageDispatcher
+from finder.views import EventCreateView
+
+logger = logging.getLogger(settings.PROJECT)
+
+GOOGLE_HOSTS = ["https://sheets.googleapis.com", "https://www.googleapis.com"]
+TELEGRAM_HOSTS = ["https://api.telegram.org"]
+FIRST_CHAT_ID = -1000000000
+MISSING_ORDER_ID = 9999999
+
+
+@dataclass
+class BenchmarkReport:
+    events: int
+    finished: int = 0
+    failed: int = 0
+    unfinished: int = 0
+    webhook_time: float = 0
+    processing_time: float = 0
+    latencies: List[float] = field(default_factory=list)
+    google_calls: Dict[str, int] = field(default_factory=dict)
+    google_bytes: int = 0
+    telegram_calls: int = 0
+    quota_errors: int = 0
+
+    @property
+    def webhooks_per_second(self) -> float:
+        return self.events / self.webhook_time if self.webhook_time else 0
+
+    @property
+    def events_per_second(self) -> float:
+        done = self.finished + self.failed
+        return done / self.processing_time if self.processing_time else 0
+
+    @property
+    def google_calls_per_event(self) -> float:
+        google_calls = sum(self.google_calls.values())
+        return google_calls / self.events if self.events else 0
+
+    @property
+    def telegram_calls_per_event(self) -> float:
+        return self.telegram_calls / self.events if self.events else 0
+
+    def percentile(self, percent: float) -> float:
+        if not self.latencies:
+            return 0
+        latencies = sorted(self.latencies)
+        index = round(percent / 100 * (len(latencies) - 1))
+        return latencies[index]
+
+
+class EventBenchmark:
+    def __init__(
+            self,
+            events: int,
+            orders: int,
+            *,
+            use_async: bool = False,
+            batch_size: Optional[int] = None,
+            concurrency: Optional[int] = None,
+            latency: float = 0,
+            error_rate: float = 0,
+            missing_rate: float = 0.1,
+            timeout: float = 300,
+            seed: int = 0,
+    ):
+        self.events = events
+        self.use_async = use_async
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.missing_rate = missing_rate
+        self.timeout = timeout
+        self.random = Random(seed)
+        self.chat_ids = list(range(FIRST_CHAT_ID, FIRST_CHAT_ID + events))
+        self.google_server = FakeGoogleServer(
+            orders, latency, error_rate, seed
+        )
+        self.telegram_server = FakeTelegramServer(latency, error_rate)
+
+    def setup(self):
+        self.google_server.start()
+        self.telegram_server.start()
+        cache.set(GOOGLE_TOKEN_CACHE_KEY, {
+            "access_token": "benchmark",
+            "token_type": "Bearer",
+            "expires_at": int(time()) + 60 * 60,
+        }, 60 * 60)
+        session = SharedAssertionSession(
+            token_endpoint="https://oauth2.googleapis.com/token",
+            issuer="benchmark",
+            subject=None,
+        )
+        self.google_client = set_gspread_client(session)
+        for host in GOOGLE_HOSTS:
+            self.google_client.session.mount(host, LocalRedirectAdapter(
+                self.google_server.base_url,
+                pool_maxsize=settings.GOOGLE_API_POOL_SIZE,
+            ))
+        for host in TELEGRAM_HOSTS:
+            get_telegram_session().mount(host, LocalRedirectAdapter(
+                self.telegram_server.base_url,
+                pool_maxsize=settings.TELEGRAM_POOL_SIZE,
+            ))
+
+    def cleanup(self):
+        Event.objects.filter(chat_id__in=self.chat_ids).delete()
+        OutgoingMessage.objects.filter(chat_id__in=self.chat_ids).delete()
+        self.google_server.shutdown()
+        self.telegram_server.shutdown()
+
+    def get_order_id(self) -> int:
+        if self.random.random() < self.missing_rate:
+            return MISSING_ORDER_ID
+        return self.random.choice(self.google_server.order_ids)
+
+    def push_webhooks(self):
+        factory = APIRequestFactory()
+        view = EventCreateView.as_view()
+        for chat_id in self.chat_ids:
+            request = factory.post("/", {"message": {
+                "chat": {"id": chat_id},
+                "text": str(self.get_order_id()),
+            }}, format="json")
+            view(request)
+
+    def start_workers(self):
+        if self.use_async:
+            worker = AsyncEventWorker(self.batch_size, self.concurrency)
+        else:
+            worker = EventWorker(self.batch_size)
+        Thread(target=worker.run, daemon=True).start()
+        Thread(target=MessageDispatcher().run, daemon=True).start()
+
+    def wait(self) -> bool:
+        deadline = time() + self.timeout
+        while time() < deadline:
+            pending_events = Event.objects.filter(
+                chat_id__in=self.chat_ids,
+                status__in=[
+                    Event.EventStatus.WAITING, Event.EventStatus.IN_PROGRESS
+                ],
+            ).exists()
+            pending_messages = OutgoingMessage.objects.filter(
+                chat_id__in=self.chat_ids,
+                status__in=[
+                    OutgoingMessage.MessageStatus.WAITING,
+                    OutgoingMessage.MessageStatus.SENDING,
+                ],
+            ).exists()
+            if not pending_events and not pending_messages:
+                return True
+            sleep(0.1)
+        return False
+
+    def run(self) -> BenchmarkReport:
+        report = BenchmarkReport(self.events)
+        self.setup()
+        try:
+            self.start_workers()
+            started_at = perf_counter()
+            self.push_webhooks()
+            report.webhook_time = perf_counter() - started_at
+            self.wait()
+            self.collect(report)
+        finally:
+            self.cleanup()
+        return report
+
+    def collect(self, report: BenchmarkReport):
+        events = list(Event.objects.filter(chat_id__in=self.chat_ids))
+        done = [event for event in events if event.finished_at]
+        report.finished = len(done)
+        report.failed = sum(
+            event.status == Event.EventStatus.FAILED for event in events
+        )
+        report.unfinished = len(events) - report.finished - report.failed
+        # Every chat sends one event, so its answer is the last message part
+        # delivered to the chat.
+        sent_at = dict(
+            OutgoingMessage.objects.filter(
+                chat_id__in=self.chat_ids,
+                status=OutgoingMessage.MessageStatus.SENT,
+            ).order_by().values("chat_id").annotate(
+                sent_at=Max("sent_at")
+            ).values_list("chat_id", "sent_at")
+        )
+        report.latencies = [
+            (sent_at[event.chat_id] - event.created_at).total_seconds()
+            for event in events if event.chat_id in sent_at
+        ]
+        if events:
+            first_created_at = min(event.created_at for event in events)
+            last_done_at = max(
+                [event.updated_at for event in events] + list(sent_at.values())
+            )
+            report.processing_time = (
+                last_done_at - first_created_at
+            ).total_seconds()
+        report.google_calls = dict(self.google_server.calls)
+        report.google_bytes = self.google_client.bytes_received
+        report.telegram_calls = self.telegram_server.total_calls
+        report.quota_errors = (
+            self.google_server.errors + self.telegram_server.errors
+        )
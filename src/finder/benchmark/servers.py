@@ -0,0 +1,277 @@
+# Standard Library
+import gzip
+import json
+import logging
+from collections import Counter
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from random import (
+    Random,
+    random,
+)
+from threading import (
+    Lock,
+    Thread,
+)
+from time import sleep
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+from urllib.parse import (
+    parse_qs,
+    unquote,
+    urlsplit,
+)
+
+# Third Party Library
+from django.conf import settings
+from gspread.utils import a1_to_rowcol
+from requests.adapters import HTTPAdapter
+
+# Application Library
+from constants import PaperFormat
+
+logger = logging.getLogger(settings.PROJECT)
+
+ANSWERS = [
+    "Заказ не найден",
+    "Заказ находится в очереди на производство",
+    "Заказ передан на склад готовой продукции",
+    "Детали находятся на участке лазерной резки",
+    "Детали находятся на участке гибки",
+    "Детали находятся на участке сварки",
+    "Детали находятся на участке покраски",
+    "Детали отгружены заказчику",
+]
+TEMPLATE_COLORS = {
+    PaperFormat.A5: {"red": 0.8509804, "green": 0.91764706, "blue": 0.827451},
+    PaperFormat.A4: {"red": 1, "green": 0.9490196, "blue": 0.8},
+    PaperFormat.A3: {"red": 0.95686275, "green": 0.8, "blue": 0.8},
+}
+STEEL_TYPES = ["Ст3 горячекатаная", "09Г2С", "AISI 304", "Оцинковка"]
+
+FIRST_ORDER_ID = 1000000
+ORDER_COLUMN = 3
+
+Response = Tuple[int, Any]
+
+
+class FakeRequestHandler(BaseHTTPRequestHandler):
+    server: "FakeServer"
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def handle_request(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, payload = self.server.respond(self.command, self.path, body)
+
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        accepts_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if accepts_gzip and "gzip" in self.headers.get("User-Agent", ""):
+            data = gzip.compress(data)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0, error_rate: float = 0):
+        super().__init__(("127.0.0.1", 0), FakeRequestHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls: Counter = Counter()
+        self.errors = 0
+        self._lock = Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def start(self) -> "FakeServer":
+        Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def respond(self, method: str, path: str, body: bytes) -> Response:
+        url = urlsplit(path)
+        endpoint = self.get_endpoint(method, url.path)
+        with self._lock:
+            self.calls[endpoint] += 1
+        if self.latency:
+            sleep(self.latency)
+        if random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            return 429, self.quota_error()
+        return self.handle(
+            endpoint, url.path, parse_qs(url.query), body
+        )
+
+    def get_endpoint(self, method: str, path: str) -> str:
+        raise NotImplementedError
+
+    def quota_error(self) -> Any:
+        raise NotImplementedError
+
+    def handle(
+            self,
+            endpoint: str,
+            path: str,
+            query: Dict[str, List[str]],
+            body: bytes,
+    ) -> Response:
+        raise NotImplementedError
+
+
+class FakeGoogleServer(FakeServer):
+    def __init__(
+            self,
+            orders: int,
+            latency: float = 0,
+            error_rate: float = 0,
+            seed: int = 0,
+    ):
+        super().__init__(latency, error_rate)
+        self.order_ids = list(range(FIRST_ORDER_ID, FIRST_ORDER_ID + orders))
+        self.rows = self.build_rows(Random(seed))
+        self.answers = ["", "", "", *ANSWERS]
+
+    def build_rows(self, rand: Random) -> List[List[dict]]:
+        colors = [*TEMPLATE_COLORS.values(), None]
+        rows = [[{"formattedValue": "Заказы"}]]
+        for order_id in self.order_ids:
+            rows.append([
+                {},
+                get_cell(None, rand.choice(colors)),
+                get_cell(str(order_id)),
+                get_cell(rand.choice(STEEL_TYPES)),
+                get_cell(str(rand.randint(1, 20))),
+                get_cell(None, rand.choice(colors)),
+            ])
+        return rows
+
+    def get_endpoint(self, method: str, path: str) -> str:
+        if path.startswith("/drive/"):
+            return "drive.files.get"
+        if "/values/" in path:
+            return "spreadsheets.values.get"
+        return "spreadsheets.get"
+
+    def quota_error(self) -> Any:
+        return {"error": {
+            "code": 429,
+            "message": "Quota exceeded for quota metric 'Read requests'",
+            "status": "RESOURCE_EXHAUSTED",
+        }}
+
+    def handle(
+            self,
+            endpoint: str,
+            path: str,
+            query: Dict[str, List[str]],
+            body: bytes,
+    ) -> Response:
+        if endpoint == "drive.files.get":
+            return 200, {"version": "1"}
+        if endpoint == "spreadsheets.values.get":
+            return 200, {"values": [self.answers]}
+        if query.get("includeGridData") == ["true"]:
+            return 200, {"sheets": [{"data": [{"rowData": [
+                {"values": row} for row in self.rows
+            ]}]}]}
+        return 200, {"sheets": self.get_template_sheets(query["ranges"])}
+
+    def get_template_sheets(self, ranges: List[str]) -> List[dict]:
+        sheets: Dict[str, List[dict]] = {}
+        template_addresses = {
+            paper_format.value: color
+            for paper_format, color in TEMPLATE_COLORS.items()
+        }
+        for cell_range in ranges:
+            title, address = unquote(cell_range).rsplit("!", 1)
+            row, column = a1_to_rowcol(address)
+            sheets.setdefault(title.strip("'"), []).append({
+                "startRow": row - 1,
+                "startColumn": column - 1,
+                "rowData": [{"values": [
+                    get_cell(None, template_addresses.get(address))
+                ]}],
+            })
+        return [
+            {"properties": {"title": title}, "data": data}
+            for title, data in sheets.items()
+        ]
+
+
+class FakeTelegramServer(FakeServer):
+    def get_endpoint(self, method: str, path: str) -> str:
+        return path.rsplit("/", 1)[-1]
+
+    def quota_error(self) -> Any:
+        return {
+            "ok": False,
+            "error_code": 429,
+            "description": "Too Many Requests: retry after 1",
+            "parameters": {"retry_after": 1},
+        }
+
+    def handle(
+            self,
+            endpoint: str,
+            path: str,
+            query: Dict[str, List[str]],
+            body: bytes,
+    ) -> Response:
+        data = json.loads(body or b"{}")
+        return 200, {"ok": True, "result": {
+            "message_id": self.calls[endpoint],
+            "chat": {"id": data.get("chat_id")},
+            "text": data.get("text"),
+        }}
+
+
+class LocalRedirectAdapter(HTTPAdapter):
+    def __init__(self, base_url: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.base_url = base_url
+
+    def send(self, request, *args, **kwargs):
+        url = urlsplit(request.url)
+        request.url = f"{self.base_url}{url.path}"
+        if url.query:
+            request.url += f"?{url.query}"
+        return super().send(request, *args, **kwargs)
+
+
+def get_cell(value: Optional[str], color: Optional[dict] = None) -> dict:
+    cell: Dict[str, Any] = {}
+    if value is not None:
+        cell["formattedValue"] = value
+    if color is not None:
+        cell["userEnteredFormat"] = {"backgroundColor": color}
+    return cell
@@ -0,0 +1,58 @@
+# Standard Library
+import logging
+from datetime import datetime
+
+# Third Party Library
+from django.conf import settings
+from django.db import transaction
+
+# Application Library
+from finder.models import (
+    ArchivedEvent,
+    Event,
+)
+
+logger = logging.getLogger(f"{settings.PROJECT}.worker")
+
+ARCHIVED_FIELDS = (
+    "id",
+    "chat_id",
+    "order_id",
+    "batch_id",
+    "status",
+    "error",
+    "created_at",
+    "updated_at",
+    "finished_at",
+    "attempts",
+    "next_attempt_at",
+)
+
+
+def archive_batch(before: datetime, batch_size: int) -> int:
+    with transaction.atomic():
+        events = list(
+            Event.objects.select_for_update(skip_locked=True).filter(
+                status__in=[
+                    Event.EventStatus.FINISHED, Event.EventStatus.FAILED
+                ],
+                updated_at__lt=before,
+            ).order_by("pk").values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        ArchivedEvent.objects.bulk_create(
+            [ArchivedEvent(**event) for event in events],
+            ignore_conflicts=True,
+        )
+        Event.objects.filter(pk__in=[event["id"] for event in events]).delete()
+    return len(events)
+
+
+def archive_events(before: datetime, batch_size: int) -> int:
+    archived = 0
+    while True:
+        count = archive_batch(before, batch_size)
+        archived += count
+        if count:
+            logger.info(f"Archived {count} events, {archived} in total")
+        if count < batch_size:
+            return archived
@@ -0,0 +1,3 @@
+EVENT_NOTIFY_CHANNEL = "finder_event"
+# First key of the advisory locks taken on chats while claiming events.
+EVENT_CHAT_LOCK_NAMESPACE = 1
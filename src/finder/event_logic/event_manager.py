@@ -1,17 +1,46 @@
 # Standard Library
 import logging
-from typing import Optional
+from collections import defaultdict
+from datetime import (
+    datetime,
+    timedelta,
+)
+from random import random
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Set,
+    Union,
+)
+from uuid import UUID
 
 # Third Party Library
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import transaction
+from django.db import (
+    connection,
+    transaction,
+)
+from django.db.models import (
+    F,
+    Min,
+    Q,
+    Window,
+)
+from django.db.models.functions import RowNumber
+from django.utils.timezone import now
 
 # Application Library
 from constants import (
     EventManagerStatus,
     MessageLevel,
 )
+from finder.event_logic.constants import EVENT_CHAT_LOCK_NAMESPACE
+from finder.event_logic.heartbeat import get_event_heartbeat
+from finder.google_table_logic.client import is_transient_error
 from finder.google_table_logic.data_manager import GoogleTableDataManager
+from finder.google_table_logic.materializer import get_materialized_results
 from finder.models import Event
 from finder.telegram_logic.client import TelegramClient
 from helpers import operate_message
@@ -19,59 +48,307 @@ from helpers import operate_message
 logger = logging.getLogger(f"{settings.PROJECT}.event")
 
 
+class ClaimExpiredError(Exception):
+    pass
+
+
 class EventManager:
-    def __init__(self):
+    def __init__(self, events: Optional[List[Event]] = None):
         self.error: Optional[str] = None
         self.status: EventManagerStatus = EventManagerStatus.IN_PROGRESS
+        self.results: List[str] = []
+
+        self.events: List[Event] = events or []
+        self.event: Optional[Event] = self.events[0] if self.events else None
+
+    @staticmethod
+    def get_fair_event_ids(claimable: Q, batch_size: int) -> List[int]:
+        # Events are ranked inside their chat and taken rank by rank, so one
+        # chat's burst can't push other chats to the back of the queue.
+        return list(
+            Event.objects.filter(claimable).annotate(
+                chat_rank=Window(
+                    expression=RowNumber(),
+                    partition_by=[F("chat_id")],
+                    order_by=F("created_at").asc(),
+                )
+            ).order_by("chat_rank", "created_at").values_list(
+                "pk", flat=True
+            )[:batch_size]
+        )
+
+    @staticmethod
+    def limit_chat_concurrency(
+            events: List[Event], concurrency: int, stale_at: datetime
+    ) -> List[Event]:
+        # The cap counts messages in flight: orders of one message are
+        # answered together and never split between workers. Claimers of
+        # one chat take turns, so the count holds until the claim commits.
+        chat_ids = lock_chats({event.chat_id for event in events})
+        chat_batches: Dict[int, Set[Union[UUID, int]]] = defaultdict(set)
+        for pk, chat_id, batch_id in Event.objects.filter(
+                status=Event.EventStatus.IN_PROGRESS,
+                updated_at__gte=stale_at,
+                chat_id__in=chat_ids,
+        ).values_list("pk", "chat_id", "batch_id"):
+            chat_batches[chat_id].add(batch_id or pk)
+        limited_events = []
+        for event in events:
+            if event.chat_id not in chat_ids:
+                continue
+            batches = chat_batches[event.chat_id]
+            message_id = event.batch_id or event.pk
+            if message_id in batches or len(batches) < concurrency:
+                batches.add(message_id)
+                limited_events.append(event)
+        return limited_events
+
+    @classmethod
+    def claim_events(cls, batch_size: int) -> List[Event]:
+        stale_at = now() - timedelta(seconds=settings.EVENT_CLAIM_TIMEOUT)
+        is_due = Q(next_attempt_at__isnull=True) | Q(
+            next_attempt_at__lte=now()
+        )
+        claimable = Q(is_due, status=Event.EventStatus.WAITING) | Q(
+            status=Event.EventStatus.IN_PROGRESS, updated_at__lt=stale_at
+        )
+        event_ids = cls.get_fair_event_ids(claimable, batch_size)
+        if not event_ids:
+            return []
+        with transaction.atomic():
+            # Window functions can't be combined with FOR UPDATE, so the
+            # fairly picked events are locked by id and checked once more.
+            events = list(
+                Event.objects.select_for_update(skip_locked=True).filter(
+                    claimable, pk__in=event_ids
+                )
+            )
+            events += Event.objects.select_for_update(skip_locked=True).filter(
+                is_due,
+                status=Event.EventStatus.WAITING,
+                order_id__in={event.order_id for event in events},
+            ).exclude(pk__in=[event.pk for event in events])
+            # Orders of one message are answered together, so the rest of
+            # every claimed batch comes along.
+            events += Event.objects.select_for_update(skip_locked=True).filter(
+                status=Event.EventStatus.WAITING,
+                batch_id__in={event.batch_id for event in events} - {None},
+            ).exclude(pk__in=[event.pk for event in events])
+            if settings.EVENT_CHAT_CONCURRENCY:
+                events = cls.limit_chat_concurrency(
+                    events, settings.EVENT_CHAT_CONCURRENCY, stale_at
+                )
+            events = cls.count_reclaimed(events)
+            Event.objects.filter(pk__in=[event.pk for event in events]).update(
+                status=Event.EventStatus.IN_PROGRESS, updated_at=now()
+            )
+        get_event_heartbeat().add(event.pk for event in events)
+        for event in events:
+            event.status = Event.EventStatus.IN_PROGRESS
+        return events
+
+    @staticmethod
+    def get_next_attempt_delay() -> Optional[float]:
+        next_attempt_at = Event.objects.filter(
+            status=Event.EventStatus.WAITING, next_attempt_at__gt=now()
+        ).aggregate(next_attempt_at=Min("next_attempt_at"))["next_attempt_at"]
+        if next_attempt_at is None:
+            return None
+        return max((next_attempt_at - now()).total_seconds(), 0)
+
+    @classmethod
+    def count_reclaimed(cls, events: List[Event]) -> List[Event]:
+        # A stale claim means its worker died on the event, so it counts as
+        # an attempt. Messages out of attempts fail instead of being claimed.
+        reclaimed_ids = [
+            event.pk for event in events
+            if event.status == Event.EventStatus.IN_PROGRESS
+        ]
+        if not reclaimed_ids:
+            return events
+        Event.objects.filter(pk__in=reclaimed_ids).update(
+            attempts=F("attempts") + 1
+        )
+        for event in events:
+            if event.pk in reclaimed_ids:
+                event.attempts += 1
+        failed_ids = set()
+        for event_manager in cls.from_events(events):
+            attempts = max(event.attempts for event in event_manager.events)
+            if attempts >= settings.EVENT_MAX_ATTEMPTS:
+                event_manager._operate_error(ClaimExpiredError(
+                    f"Processing was interrupted, {attempts} attempts made"
+                ))
+                failed_ids.update(event_manager.event_pks)
+        return [event for event in events if event.pk not in failed_ids]
+
+    @property
+    def order_ids(self) -> List[int]:
+        return list(dict.fromkeys(event.order_id for event in self.events))
+
+    @classmethod
+    def from_events(cls, events: List[Event]) -> List["EventManager"]:
+        batch_events: Dict[Union[UUID, int], List[Event]] = defaultdict(list)
+        for event in events:
+            batch_events[event.batch_id or event.pk].append(event)
+        return [cls(group) for group in batch_events.values()]
+
+    @classmethod
+    def process_batch(cls, batch_size: int) -> List["EventManager"]:
+        event_managers = cls.from_events(
+            cls.claim_events(batch_size)
+        ) or [cls()]
+        for event_manager in event_managers:
+            event_manager.process()
+        return event_managers
 
-        self.event: Optional[Event] = None
-        self.chat_id: Optional[int] = None
-        self.telegram_client: Optional[TelegramClient] = None
+    @property
+    def event_pks(self) -> List[int]:
+        return [event.pk for event in self.events]
 
-    def post_init(self):
-        self.event = Event.objects.select_for_update().filter(
-            status=Event.EventStatus.WAITING
-        ).first()
-        self.chat_id = self.event and self.event.chat_id
-        self.telegram_client = self.event and TelegramClient(self.chat_id)
+    @property
+    def event_ids(self) -> str:
+        return ", ".join(str(event.pk) for event in self.events)
 
+    @transaction.atomic
     def _operate_success(self):
-        self.event.set_success()
         self.status = EventManagerStatus.SUCCESS
-        message = f"Event {self.event.pk} operated successfully"
+        for event in self.events:
+            event.set_success()
+        telegram_client = TelegramClient(self.event.chat_id)
         operate_message(
-            logger, self.telegram_client, message, MessageLevel.INFO
+            logger,
+            telegram_client,
+            "\n\n".join(self.results),
+            MessageLevel.INFO
         )
+        message = f"Event {self.event_ids} operated successfully"
+        operate_message(logger, telegram_client, message, MessageLevel.INFO)
 
+    @transaction.atomic
+    def _operate_retry(self, exc):
+        self.status = EventManagerStatus.RETRY
+        self.error = str(exc)
+        delay = get_retry_delay(self.event.attempts)
+        for event in self.events:
+            event.set_retry(exc, delay)
+        logger.warning(
+            f"Event {self.event_ids} failed with error: {self.error}, "
+            f"retry in {delay:.1f} sec"
+        )
+
+    @transaction.atomic
     def _operate_error(self, exc):
-        self.event.set_error(exc)
-        self.error = self.event.error
+        if is_transient_error(exc) and all(
+                event.attempts + 1 < settings.EVENT_MAX_ATTEMPTS
+                for event in self.events
+        ):
+            return self._operate_retry(exc)
+
         self.status = EventManagerStatus.ERROR
-        message = f"Event {self.event.pk} failed with error: {self.error}"
+        for event in self.events:
+            event.set_error(exc)
+            self.error = event.error
+        message = f"Event {self.event_ids} failed with error: {self.error}"
         operate_message(
-            logger, self.telegram_client, message, MessageLevel.ERROR
+            logger,
+            TelegramClient(self.event.chat_id),
+            message,
+            MessageLevel.ERROR
         )
 
+    def collect_results(self, order_results: Dict[int, List[str]]):
+        if len(self.order_ids) == 1:
+            self.results = order_results[self.order_ids[0]]
+            return
+        # A combined reply names every order, so its lines can be told apart.
+        self.results = [
+            "\n".join([f"{order_id}:", *order_results[order_id]])
+            for order_id in self.order_ids
+        ]
+
     def process_event(self):
-        self.event.set_in_progress()
-        data_manager = GoogleTableDataManager()
-        results = data_manager.process_order(self.event.order_id)
-        operate_message(
-            logger,
-            self.telegram_client,
-            "\n\n".join(results),
-            MessageLevel.INFO
-        )
+        order_results = get_materialized_results(self.order_ids)
+        missing_order_ids = [
+            order_id for order_id in self.order_ids
+            if order_id not in order_results
+        ]
+        if missing_order_ids:
+            data_manager = GoogleTableDataManager()
+            order_results.update(
+                data_manager.process_orders(missing_order_ids)
+            )
+        self.collect_results(order_results)
+
+    async def aprocess_event(self):
+        # ORM calls share the worker's single sync thread and connection,
+        # only Google I/O runs in the executor pool.
+        order_results = await sync_to_async(
+            get_materialized_results, thread_sensitive=True
+        )(self.order_ids)
+        missing_order_ids = [
+            order_id for order_id in self.order_ids
+            if order_id not in order_results
+        ]
+        if missing_order_ids:
+            data_manager = GoogleTableDataManager()
+            order_results.update(
+                await data_manager.aprocess_orders(missing_order_ids)
+            )
+        self.collect_results(order_results)
+
+    async def aprocess(self):
+        if self.event:
+            try:
+                await self.aprocess_event()
+            except Exception as exc:
+                await sync_to_async(
+                    self._operate_error, thread_sensitive=True
+                )(exc)
+            else:
+                await sync_to_async(
+                    self._operate_success, thread_sensitive=True
+                )()
+            finally:
+                get_event_heartbeat().discard(self.event_pks)
+        else:
+            self.status = EventManagerStatus.SKIP
 
     def process(self):
-        with transaction.atomic():
-            self.post_init()
-            if self.event:
-                try:
-                    self.process_event()
-                except Exception as exc:
-                    self._operate_error(exc)
-                else:
-                    self._operate_success()
+        if self.event:
+            try:
+                self.process_event()
+            except Exception as exc:
+                self._operate_error(exc)
             else:
-                self.status = EventManagerStatus.SKIP
+                self._operate_success()
+            finally:
+                get_event_heartbeat().discard(self.event_pks)
+        else:
+            self.status = EventManagerStatus.SKIP
+
+
+def lock_chats(
+        chat_ids: Set[int], namespace: int = EVENT_CHAT_LOCK_NAMESPACE
+) -> Set[int]:
+    # Locks are held until the transaction ends. Chats locked by another
+    # claimer are skipped, the same way SKIP LOCKED skips their rows.
+    if connection.vendor != "postgresql" or not chat_ids:
+        return chat_ids
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT chat_id FROM unnest(%s) AS chat_id "
+            "WHERE pg_try_advisory_xact_lock(%s, chat_id)",
+            [list(chat_ids), namespace],
+        )
+        return {chat_id for chat_id, in cursor.fetchall()}
+
+
+def get_retry_delay(attempt: int) -> float:
+    # Exponential backoff with jitter, so events failed by the same outage
+    # do not come back all at once.
+    delay = min(
+        settings.EVENT_RETRY_BACKOFF * 2 ** attempt,
+        settings.EVENT_RETRY_MAX_DELAY,
+    )
+    return delay * (0.5 + random() / 2)
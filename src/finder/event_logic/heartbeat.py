@@ -0,0 +1,87 @@
+# Standard Library
+import logging
+from threading import (
+    Event as StopEvent,
+    Lock,
+    Thread,
+)
+from typing import (
+    Iterable,
+    Optional,
+    Set,
+)
+
+# Third Party Library
+from django.conf import settings
+from django.db import (
+    close_old_connections,
+    connection,
+)
+from django.utils.timezone import now
+
+# Application Library
+from finder.models import Event
+
+logger = logging.getLogger(f"{settings.PROJECT}.worker")
+
+event_heartbeat = None
+
+
+class EventHeartbeat:
+    # Claimed events are touched while they are processed, so only events
+    # of a worker that died go stale and are claimed again.
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or settings.EVENT_HEARTBEAT_INTERVAL
+        self._lock = Lock()
+        self._event_ids: Set[int] = set()
+        self._stopped = StopEvent()
+        self._thread: Optional[Thread] = None
+
+    def add(self, event_ids: Iterable[int]):
+        with self._lock:
+            self._event_ids.update(event_ids)
+
+    def discard(self, event_ids: Iterable[int]):
+        with self._lock:
+            self._event_ids.difference_update(event_ids)
+
+    def beat(self) -> int:
+        with self._lock:
+            event_ids = list(self._event_ids)
+        if not event_ids:
+            return 0
+        return Event.objects.filter(
+            pk__in=event_ids, status=Event.EventStatus.IN_PROGRESS
+        ).update(updated_at=now())
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            close_old_connections()
+            try:
+                self.beat()
+            except Exception as exc:
+                logger.error(f"Failed to refresh claimed events: {exc}")
+        connection.close()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+
+def get_event_heartbeat() -> EventHeartbeat:
+    return event_heartbeat or set_event_heartbeat()
+
+
+def set_event_heartbeat(interval: Optional[float] = None):
+    global event_heartbeat
+    event_heartbeat = EventHeartbeat(interval)
+    return event_heartbeat
@@ -0,0 +1,96 @@
+# Standard Library
+import asyncio
+import logging
+from typing import (
+    List,
+    Optional,
+    Tuple,
+)
+from weakref import WeakKeyDictionary
+
+# Third Party Library
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+# Application Library
+from finder.models import (
+    Event,
+    OutgoingMessage,
+)
+
+logger = logging.getLogger(settings.PROJECT)
+
+PendingItem = Tuple[List[Event], List[OutgoingMessage], asyncio.Future]
+
+event_batchers: WeakKeyDictionary = WeakKeyDictionary()
+
+
+class EventBatcher:
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending: List[PendingItem] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def add(
+            self,
+            events: List[Event],
+            messages: List[OutgoingMessage],
+    ):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((events, messages, future))
+        if len(self.pending) >= self.batch_size:
+            self._schedule_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.flush_interval, self._schedule_flush
+            )
+        await future
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self.pending = self.pending, []
+        if pending:
+            asyncio.ensure_future(self.flush(pending))
+
+    async def flush(self, pending: List[PendingItem]):
+        events = [event for item in pending for event in item[0]]
+        messages = [message for item in pending for message in item[1]]
+        try:
+            await sync_to_async(save_batch)(events, messages)
+        except Exception as exc:
+            logger.error(f"Failed to save {len(events)} events: {exc}")
+            for _, _, future in pending:
+                future.set_exception(exc)
+        else:
+            logger.debug(
+                f"Saved {len(events)} events and {len(messages)} messages"
+            )
+            for _, _, future in pending:
+                future.set_result(None)
+
+
+@transaction.atomic
+def save_batch(events: List[Event], messages: List[OutgoingMessage]):
+    Event.objects.bulk_create(events)
+    OutgoingMessage.objects.bulk_create(messages)
+
+
+def get_event_batcher() -> EventBatcher:
+    # Pending futures and flush timers belong to one event loop. The ingest
+    # path is meant to run under ASGI, where all requests share the loop
+    # and get batched together. Under WSGI every async view runs in a loop
+    # of its own, so each request just gets flushed alone.
+    loop = asyncio.get_running_loop()
+    return event_batchers.get(loop) or set_event_batcher(loop)
+
+
+def set_event_batcher(loop: asyncio.AbstractEventLoop) -> EventBatcher:
+    event_batchers[loop] = EventBatcher(
+        settings.EVENT_INGEST_BATCH_SIZE, settings.EVENT_INGEST_FLUSH_INTERVAL
+    )
+    return event_batchers[loop]
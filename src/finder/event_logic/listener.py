@@ -0,0 +1,49 @@
+# Standard Library
+import logging
+import select
+from time import sleep
+from typing import Optional
+
+# Third Party Library
+from django.conf import settings
+from django.db import connection
+from psycopg2.extensions import connection as PGConnection
+
+# Application Library
+from finder.event_logic.constants import EVENT_NOTIFY_CHANNEL
+
+logger = logging.getLogger(f"{settings.PROJECT}.worker")
+
+
+class EventListener:
+    def __init__(self, channel: str = EVENT_NOTIFY_CHANNEL):
+        self.channel = channel
+        self._connection: Optional[PGConnection] = None
+
+    @property
+    def is_supported(self) -> bool:
+        return connection.vendor == "postgresql"
+
+    def listen(self) -> PGConnection:
+        connection.ensure_connection()
+        pg_connection = connection.connection
+        if self._connection is not pg_connection:
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+            self._connection = pg_connection
+            logger.info(f"Listen to channel '{self.channel}'")
+        return pg_connection
+
+    def wait(self, timeout: float) -> bool:
+        if not self.is_supported:
+            sleep(timeout)
+            return False
+
+        pg_connection = self.listen()
+        if not pg_connection.notifies:
+            ready, _, _ = select.select([pg_connection], [], [], timeout)
+            if ready:
+                pg_connection.poll()
+        notified = bool(pg_connection.notifies)
+        pg_connection.notifies.clear()
+        return notified
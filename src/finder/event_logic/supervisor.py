@@ -0,0 +1,183 @@
+# Standard Library
+import logging
+import math
+import signal
+from multiprocessing import Process
+from time import (
+    monotonic,
+    sleep,
+)
+from typing import (
+    List,
+    Optional,
+    Tuple,
+)
+
+# Third Party Library
+from django.conf import settings
+from django.db import connections
+from django.db.models import (
+    Count,
+    Min,
+    Q,
+)
+from django.utils.timezone import now
+
+# Application Library
+from finder.event_logic.worker import (
+    AsyncEventWorker,
+    EventWorker,
+)
+from finder.models import Event
+
+logger = logging.getLogger(f"{settings.PROJECT}.worker")
+
+
+def run_worker(
+        use_async: bool,
+        batch_size: Optional[int],
+        concurrency: Optional[int],
+        max_events: Optional[int],
+        max_memory: Optional[int],
+):
+    worker: EventWorker
+    if use_async:
+        worker = AsyncEventWorker(
+            batch_size, concurrency, max_events, max_memory
+        )
+    else:
+        worker = EventWorker(batch_size, max_events, max_memory)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+def get_queue_stats() -> Tuple[int, float]:
+    stats = Event.objects.filter(
+        Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now()),
+        status=Event.EventStatus.WAITING,
+    ).aggregate(depth=Count("pk"), oldest=Min("created_at"))
+    if stats["oldest"] is None:
+        return stats["depth"], 0
+    return stats["depth"], (now() - stats["oldest"]).total_seconds()
+
+
+class WorkerSupervisor:
+    def __init__(
+            self,
+            min_workers: Optional[int] = None,
+            max_workers: Optional[int] = None,
+            *,
+            use_async: bool = False,
+            batch_size: Optional[int] = None,
+            concurrency: Optional[int] = None,
+            max_events: Optional[int] = None,
+            max_memory: Optional[int] = None,
+    ):
+        self.min_workers = min_workers or settings.EVENT_SUPERVISOR_MIN_WORKERS
+        self.max_workers = max(
+            max_workers or settings.EVENT_SUPERVISOR_MAX_WORKERS,
+            self.min_workers,
+        )
+        self.worker_args = (
+            use_async, batch_size, concurrency, max_events, max_memory
+        )
+        self.workers: List[Process] = []
+        self.stopping: List[Process] = []
+        self.scaled_at = monotonic()
+        self.running = True
+
+    def stop(self, *args):
+        if self.running:
+            logger.info("Supervisor stop requested")
+        self.running = False
+
+    def start_worker(self):
+        # Forked workers must not share the supervisor's DB connection.
+        connections.close_all()
+        process = Process(target=run_worker, args=self.worker_args)
+        process.start()
+        self.workers.append(process)
+        logger.info(f"Started worker {process.pid}")
+
+    def stop_worker(self):
+        process = self.workers.pop()
+        process.terminate()
+        self.stopping.append(process)
+        logger.info(f"Stopping worker {process.pid}")
+
+    def reap(self):
+        for process in self.workers[:]:
+            if process.is_alive():
+                continue
+            self.workers.remove(process)
+            process.join()
+            if process.exitcode == 0:
+                logger.info(f"Worker {process.pid} recycled")
+            else:
+                logger.error(
+                    f"Worker {process.pid} exited with code "
+                    f"{process.exitcode}, restarting"
+                )
+        for process in self.stopping[:]:
+            if not process.is_alive():
+                self.stopping.remove(process)
+                process.join()
+                logger.info(f"Worker {process.pid} stopped")
+
+    def get_target(self) -> int:
+        depth, age = get_queue_stats()
+        target = math.ceil(depth / settings.EVENT_SUPERVISOR_EVENTS_PER_WORKER)
+        # A queue that is short but slow to move still needs more hands.
+        if age > settings.EVENT_SUPERVISOR_MAX_EVENT_AGE:
+            target = max(target, len(self.workers) + 1)
+        target = min(max(target, self.min_workers), self.max_workers)
+        logger.info(
+            f"Queue depth {depth}, oldest event {age:.1f} sec, "
+            f"target {target} workers"
+        )
+        return target
+
+    def scale(self):
+        try:
+            target = self.get_target()
+        except Exception as exc:
+            logger.error(f"Failed to read queue stats: {exc}")
+            target = max(len(self.workers), self.min_workers)
+        # Scaling up and replacing exited workers is immediate, scaling down
+        # waits a while so a short lull doesn't flap the pool.
+        if len(self.workers) < target:
+            while len(self.workers) < target:
+                self.start_worker()
+            self.scaled_at = monotonic()
+        elif len(self.workers) > target:
+            delay = settings.EVENT_SUPERVISOR_SCALE_DOWN_DELAY
+            if monotonic() - self.scaled_at >= delay:
+                self.stop_worker()
+                self.scaled_at = monotonic()
+
+    def shutdown(self):
+        for process in self.workers:
+            process.terminate()
+        self.stopping += self.workers
+        self.workers = []
+        logger.info(f"Drain {len(self.stopping)} workers")
+        deadline = monotonic() + settings.EVENT_SUPERVISOR_STOP_TIMEOUT
+        for process in self.stopping:
+            process.join(max(deadline - monotonic(), 0))
+            if process.is_alive():
+                logger.warning(f"Kill worker {process.pid} after timeout")
+                process.kill()
+                process.join()
+        self.stopping = []
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        try:
+            while self.running:
+                self.reap()
+                self.scale()
+                sleep(settings.EVENT_SUPERVISOR_INTERVAL)
+        finally:
+            self.shutdown()
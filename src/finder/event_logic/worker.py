@@ -0,0 +1,207 @@
+# Standard Library
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Optional,
+    Set,
+)
+
+# Third Party Library
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+# Application Library
+from constants import EventManagerStatus
+from finder.event_logic.event_manager import EventManager
+from finder.event_logic.heartbeat import get_event_heartbeat
+from finder.event_logic.listener import EventListener
+from finder.google_table_logic.client import get_gspread_client
+from finder.google_table_logic.revision import RevisionWatcher
+
+logger = logging.getLogger(f"{settings.PROJECT}.worker")
+
+
+def log_event_manager(event_manager: EventManager):
+    event_ids = event_manager.event_ids
+    logger.info(
+        f"Finished to proceed event {event_ids}: {event_manager.status}"
+    )
+    if event_manager.status == EventManagerStatus.ERROR:
+        logger.error(
+            f"Event {event_ids} failed with error: {event_manager.error}"
+        )
+
+
+def get_memory_usage() -> int:
+    # Current resident set size in MB, the second field of statm is the
+    # number of resident pages. Peak usage never shrinks, so it can't be
+    # used to decide whether the worker has grown.
+    try:
+        with open("/proc/self/statm") as statm:
+            resident = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return resident * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+
+
+class EventWorker:
+    def __init__(
+            self,
+            batch_size: Optional[int] = None,
+            max_events: Optional[int] = None,
+            max_memory: Optional[int] = None,
+    ):
+        self.batch_size = batch_size or settings.EVENT_WORKER_BATCH_SIZE
+        self.max_events = max_events or settings.EVENT_WORKER_MAX_EVENTS
+        self.max_memory = max_memory or settings.EVENT_WORKER_MAX_MEMORY
+        self.listener = EventListener()
+        self.timeout = settings.EVENT_WORKER_MIN_TIMEOUT
+        self.revision_watcher = RevisionWatcher()
+        self.running = True
+        self.processed = 0
+
+    def stop(self, *args):
+        # Safe to use as a signal handler: the current iteration is
+        # finished and the worker leaves its loop afterwards.
+        if self.running:
+            logger.info("Stop requested, finishing claimed events")
+        self.running = False
+
+    @property
+    def should_stop(self) -> bool:
+        if not self.running:
+            return True
+        if self.max_events and self.processed >= self.max_events:
+            logger.info(f"Recycle worker after {self.processed} events")
+            return True
+        memory_usage = get_memory_usage()
+        if self.max_memory and memory_usage >= self.max_memory:
+            logger.info(f"Recycle worker at {memory_usage} MB")
+            return True
+        return False
+
+    def wait(self) -> bool:
+        # Retries come due without a notification, so the worker doesn't
+        # sleep past the nearest one.
+        timeout = self.timeout
+        next_attempt_delay = EventManager.get_next_attempt_delay()
+        if next_attempt_delay is not None:
+            timeout = min(timeout, next_attempt_delay)
+        notified = self.listener.wait(timeout)
+        self.backoff(notified)
+        return notified
+
+    def warm_up(self):
+        # Keeps the shared access token renewed between events, so token
+        # rollover never lands on an event.
+        try:
+            get_gspread_client().session.ensure_active_token()
+        except Exception as exc:
+            logger.error(f"Failed to renew Google access token: {exc}")
+
+    def backoff(self, reset: bool):
+        if reset:
+            self.timeout = settings.EVENT_WORKER_MIN_TIMEOUT
+        else:
+            self.timeout = min(
+                self.timeout * 2, settings.EVENT_WORKER_MAX_TIMEOUT
+            )
+
+    def run(self):
+        heartbeat = get_event_heartbeat()
+        heartbeat.start()
+        try:
+            while not self.should_stop:
+                self.run_iteration()
+        finally:
+            heartbeat.stop()
+
+    def run_iteration(self):
+        logger.info("Start iteration")
+        close_old_connections()
+        self.warm_up()
+        self.revision_watcher.poll_if_due()
+        event_managers = EventManager.process_batch(self.batch_size)
+        for event_manager in event_managers:
+            log_event_manager(event_manager)
+            self.processed += len(event_manager.events)
+
+        if event_managers[0].event:
+            self.backoff(reset=True)
+        else:
+            self.wait()
+
+
+class AsyncEventWorker(EventWorker):
+    def __init__(
+            self,
+            batch_size: Optional[int] = None,
+            concurrency: Optional[int] = None,
+            max_events: Optional[int] = None,
+            max_memory: Optional[int] = None,
+    ):
+        super().__init__(batch_size, max_events, max_memory)
+        self.concurrency = concurrency or settings.EVENT_WORKER_CONCURRENCY
+        self.tasks: Set[asyncio.Task] = set()
+
+    async def process_event(self, event_manager: EventManager):
+        await event_manager.aprocess()
+        log_event_manager(event_manager)
+
+    async def claim(self) -> int:
+        free_slots = self.concurrency - len(self.tasks)
+        if free_slots <= 0:
+            return 0
+
+        events = await sync_to_async(
+            EventManager.claim_events, thread_sensitive=True
+        )(min(free_slots, self.batch_size))
+        self.processed += len(events)
+        for event_manager in EventManager.from_events(events):
+            self.tasks.add(
+                asyncio.create_task(self.process_event(event_manager))
+            )
+        logger.info(
+            f"Claimed {len(events)} events, {len(self.tasks)} in flight"
+        )
+        return len(events)
+
+    async def arun(self):
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.concurrency)
+        )
+        while not self.should_stop:
+            await sync_to_async(
+                close_old_connections, thread_sensitive=True
+            )()
+            await sync_to_async(self.warm_up, thread_sensitive=True)()
+            await sync_to_async(
+                self.revision_watcher.poll_if_due, thread_sensitive=True
+            )()
+            claimed = await self.claim()
+            if claimed:
+                self.backoff(reset=True)
+            if claimed >= self.batch_size:
+                continue
+            if self.tasks:
+                _, self.tasks = await asyncio.wait(
+                    self.tasks,
+                    timeout=self.timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            else:
+                await sync_to_async(self.wait, thread_sensitive=True)()
+        if self.tasks:
+            logger.info(f"Drain {len(self.tasks)} events in flight")
+            await asyncio.wait(self.tasks)
+
+    def run(self):
+        heartbeat = get_event_heartbeat()
+        heartbeat.start()
+        try:
+            asyncio.run(self.arun())
+        finally:
+            heartbeat.stop()
@@ -1,11 +1,18 @@
 # Standard Library
 import json
+import logging
 from dataclasses import (
     InitVar,
     asdict,
     dataclass,
     field,
 )
+from functools import lru_cache
+from threading import Thread
+from time import (
+    sleep,
+    time,
+)
 from typing import (
     Dict,
     List,
@@ -14,13 +21,38 @@ from typing import (
 
 # Third Party Library
 from authlib.integrations.requests_client import AssertionSession
+from authlib.integrations.requests_client.assertion_session import (
+    AssertionAuth,
+)
 from django.conf import settings
+from django.core.cache import cache
 from google.auth.transport.requests import AuthorizedSession
 from gspread import Client
+from gspread.exceptions import APIError
 from gspread.utils import convert_credentials
+from requests import (
+    ConnectionError,
+    Timeout,
+)
+from requests.adapters import HTTPAdapter
 
 # Application Library
-from finder.google_table_logic.constants import SCOPES
+from circuit_breaker import (
+    CircuitOpenError,
+    get_circuit_breaker,
+)
+from finder.google_table_logic.constants import (
+    GOOGLE_API_CIRCUIT_BREAKER_NAME,
+    GOOGLE_API_RATE_LIMITER_NAME,
+    GOOGLE_API_USER_AGENT,
+    GOOGLE_TOKEN_CACHE_KEY,
+    SCOPES,
+    TRANSIENT_STATUS_CODES,
+)
+from helpers import LOCK_CACHE_KEY
+from rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(settings.PROJECT)
 
 gspread_client = None
 
@@ -29,6 +61,75 @@ class GSpreadClient(Client):
     def __init__(self, auth=None, session=None):
         self.auth = auth and convert_credentials(auth)
         self.session = session or AuthorizedSession(self.auth)
+        # Google only compresses responses for clients that ask for gzip in
+        # both the Accept-Encoding and the User-Agent headers.
+        self.session.headers.update({
+            "Accept-Encoding": "gzip",
+            "User-Agent": GOOGLE_API_USER_AGENT.format(
+                project=settings.PROJECT
+            ),
+        })
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.GOOGLE_API_POOL_SIZE,
+            max_retries=settings.GOOGLE_API_CONNECT_RETRIES,
+        ))
+        self.rate_limiter = get_rate_limiter(
+            GOOGLE_API_RATE_LIMITER_NAME,
+            settings.GOOGLE_API_RATE_LIMIT,
+            settings.GOOGLE_API_RATE_LIMIT_PERIOD,
+        )
+        self.circuit_breaker = get_circuit_breaker(
+            GOOGLE_API_CIRCUIT_BREAKER_NAME,
+            settings.GOOGLE_API_CIRCUIT_ERROR_RATE,
+            settings.GOOGLE_API_CIRCUIT_MIN_REQUESTS,
+            settings.GOOGLE_API_CIRCUIT_WINDOW,
+            settings.GOOGLE_API_CIRCUIT_OPEN_TIMEOUT,
+        )
+        self.calls = 0
+        self.bytes_received = 0
+
+    def request(self, method, endpoint, *args, **kwargs):
+        self.circuit_breaker.before_call()
+        self.rate_limiter.acquire()
+        started_at = time()
+        try:
+            response = super().request(method, endpoint, *args, **kwargs)
+        except Exception as exc:
+            if is_transient_error(exc):
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            raise
+        self.circuit_breaker.record_success()
+        received = get_received_bytes(response)
+        self.calls += 1
+        self.bytes_received += received
+        logger.debug(
+            f"Google API {method.upper()} {endpoint.split('?')[0]}: "
+            f"{received} bytes received, {len(response.content)} decoded, "
+            f"{time() - started_at:.3f} sec"
+        )
+        return response
+
+    @property
+    def remaining_quota(self) -> float:
+        return self.rate_limiter.remaining()
+
+
+def is_transient_error(exc: Exception) -> bool:
+    if isinstance(exc, APIError):
+        return exc.response.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(exc, (CircuitOpenError, ConnectionError, Timeout))
+
+
+def get_received_bytes(response) -> int:
+    # The raw stream counts bytes as they came over the wire, i.e. before
+    # the body was decompressed.
+    try:
+        return response.raw.tell()
+    except (AttributeError, ValueError):
+        return len(response.content)
 
 
 @dataclass
@@ -56,9 +157,77 @@ class Creds:
             self.header["kid"] = key_id
 
 
-def create_assertion_session(conf_file, scopes=None, subject=None):
+class SharedTokenAuth(AssertionAuth):
+    def ensure_active_token(self):
+        return self.client.ensure_active_token()
+
+
+class SharedAssertionSession(AssertionSession):
+    token_auth_class = SharedTokenAuth
+    lock_key = LOCK_CACHE_KEY.format(key=GOOGLE_TOKEN_CACHE_KEY)
+
+    @property
+    def token_ttl(self) -> float:
+        expires_at = self.token and self.token.get("expires_at")
+        return expires_at - time() if expires_at else 0
+
+    def ensure_active_token(self):
+        # Tokens are shared by every process through the cache. The one that
+        # takes the lock renews the token ahead of expiry in the background,
+        # so requests only wait for an exchange when no valid token exists.
+        if self.token_ttl <= settings.GOOGLE_TOKEN_REFRESH_MARGIN:
+            self.load_shared_token()
+        if self.token_ttl > settings.GOOGLE_TOKEN_REFRESH_MARGIN:
+            return self.token
+
+        lock_timeout = settings.GOOGLE_TOKEN_LOCK_TIMEOUT
+        if self.token_ttl > 0:
+            if cache.add(self.lock_key, 1, lock_timeout):
+                Thread(target=self.refresh_in_background, daemon=True).start()
+            return self.token
+
+        if not cache.add(self.lock_key, 1, lock_timeout):
+            deadline = time() + lock_timeout
+            while time() < deadline and cache.get(self.lock_key):
+                sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+            if self.load_shared_token():
+                return self.token
+            cache.add(self.lock_key, 1, lock_timeout)
+        return self.refresh_token()
+
+    def load_shared_token(self) -> bool:
+        token = cache.get(GOOGLE_TOKEN_CACHE_KEY)
+        if not token or token["expires_at"] <= time():
+            return False
+        self.token = token
+        return True
+
+    def refresh_token(self):
+        try:
+            token = super().refresh_token()
+            cache.set(GOOGLE_TOKEN_CACHE_KEY, dict(token), self.token_ttl)
+            logger.info(f"Google access token renewed, ttl {self.token_ttl}")
+            return token
+        finally:
+            cache.delete(self.lock_key)
+
+    def refresh_in_background(self):
+        try:
+            self.refresh_token()
+        except Exception as exc:
+            logger.error(f"Failed to renew Google access token: {exc}")
+
+
+@lru_cache()
+def read_creds(conf_file: str) -> dict:
     with open(conf_file, "r") as f:
-        return AssertionSession(**asdict(Creds(json.load(f), scopes, subject)))
+        return json.load(f)
+
+
+def create_assertion_session(conf_file, scopes=None, subject=None):
+    return SharedAssertionSession(
+        **asdict(Creds(read_creds(conf_file), scopes, subject))
+    )
 
 
 def get_gspread_client() -> GSpreadClient:
@@ -66,9 +235,9 @@ def get_gspread_client() -> GSpreadClient:
     return gspread_client or set_gspread_client()
 
 
-def set_gspread_client():
+def set_gspread_client(session=None):
     global gspread_client
     gspread_client = GSpreadClient(
-        session=create_assertion_session(settings.KEY_FILE_PATH)
+        session=session or create_assertion_session(settings.KEY_FILE_PATH)
     )
     return gspread_client
@@ -4,3 +4,21 @@ SCOPES = [
     "https://www.googleapis.com/auth/drive.file",
     "https://www.googleapis.com/auth/drive"
 ]
+
+GOOGLE_API_RATE_LIMITER_NAME = "GOOGLE_API"
+GOOGLE_API_CIRCUIT_BREAKER_NAME = "GOOGLE_API"
+TRANSIENT_STATUS_CODES = (429, 500, 502, 503, 504)
+GOOGLE_TOKEN_CACHE_KEY = "GOOGLE_ACCESS_TOKEN"
+GOOGLE_API_USER_AGENT = "{project} (gzip)"
+
+ANSWERS_RANGE = "'{title}'!D:D"
+VALUES_FIELDS = "values"
+
+SHEET_GENERATION_CACHE_KEY = "SHEET_GENERATION"
+SHEET_REVISION_CACHE_KEY = "SHEET_REVISION"
+SHEET_REVISION_POLL_CACHE_KEY = "SHEET_REVISION_POLL"
+
+DRIVE_FILE_URL = "{base_url}/files/{file_id}"
+DRIVE_REVISION_FIELDS = "version,modifiedTime"
+
+MATERIALIZED_GENERATION_CACHE_KEY = "MATERIALIZED_GENERATION"
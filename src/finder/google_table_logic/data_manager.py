@@ -1,46 +1,52 @@
 # Standard Library
 import logging
-import re
-from contextlib import suppress
 from dataclasses import (
     InitVar,
     dataclass,
     field,
 )
-from functools import (
-    cached_property,
-    partial,
-)
-from time import sleep
+from functools import cached_property
 from typing import (
-    Callable,
     Dict,
     List,
     Optional,
     Tuple,
-    Union,
 )
 
 # Third Party Library
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from gspread import (
-    Spreadsheet,
-    Worksheet,
-)
-from gspread_formatting import (
-    CellFormat,
-    get_user_entered_format,
-)
+from gspread import Spreadsheet
+from gspread_formatting import Color
 
 # Application Library
 from constants import PaperFormat
 from finder.google_table_logic.client import get_gspread_client
+from finder.google_table_logic.constants import (
+    ANSWERS_RANGE,
+    SHEET_GENERATION_CACHE_KEY,
+    VALUES_FIELDS,
+)
+from finder.google_table_logic.formats import get_background_colors
+from finder.google_table_logic.order_index import (
+    OrderIndex,
+    get_order_index,
+)
+from finder.google_table_logic.revision import get_sheet_generation
+from finder.google_table_logic.rules import (
+    CellTemplate,
+    DecisionTable,
+    Rule,
+    get_decision_table,
+)
+from finder.google_table_logic.snapshot import (
+    SheetSnapshot,
+    get_snapshot,
+)
 from helpers import cached_method
 
 logger = logging.getLogger(settings.PROJECT)
 
-CellTemplate = Dict[PaperFormat, Optional[str]]
-
 TEMPLATES_CACHE_KEY = "CELL_TEMPLATES"
 ANSWER_LIST_CACHE_KEY = "ANSWER_LIST"
 ORDERS_CACHE_KEY = "ORDER_{order_id}"
@@ -60,52 +66,37 @@ def get_orders_cache_key(_, order_id: int):
 
 @dataclass
 class TableData:
-    order: InitVar[str]
-    search_sheet: InitVar[Worksheet]
+    order: InitVar[Tuple[int, int]]
+    snapshot: InitVar[SheetSnapshot]
 
     cell_coordinates: Tuple[int, int] = field(init=False)
     cell_address: str = field(init=False)
-    steel_type: str = field(init=False)
-    steel_depth: str = field(init=False)
-    user_cell_color: Optional[str] = field(init=False)
-    user_f_row_color: Optional[str] = field(init=False)
-
-    def __post_init__(self, order: str, search_sheet: Worksheet):
-        row = int(re.search(r"(R[0-9]+)", order).group(0)[1:])  # type: ignore
-        column = int(
-            re.search(r"(C[0-9]+)", order).group(0)[1:]  # type: ignore
-        ) - 1
+    steel_type: Optional[str] = field(init=False)
+    steel_depth: Optional[str] = field(init=False)
+    user_cell_color: Optional[Color] = field(init=False)
+    user_f_row_color: Optional[Color] = field(init=False)
+
+    def __post_init__(
+            self, order: Tuple[int, int], snapshot: SheetSnapshot
+    ):
+        row, column = order[0], order[1] - 1
         self.cell_coordinates = (row, column)
-        self.cell_address = search_sheet.cell(row, column).address
-        self.steel_type = search_sheet.cell(row, 4).value
-        self.steel_depth = search_sheet.cell(row, 5).value
+        self.cell_address = snapshot.address(row, column)
+        self.steel_type = snapshot.value(row, 4)
+        self.steel_depth = snapshot.value(row, 5)
 
-        self.user_cell_color = get_format_safe(
-            get_user_entered_format, search_sheet, self.cell_address
-        ).backgroundColor
-        self.user_f_row_color = get_format_safe(
-            get_user_entered_format, search_sheet, f"F{row}"
-        ).backgroundColor
+        self.user_cell_color = snapshot.background_color(row, column)
+        self.user_f_row_color = snapshot.background_color(row, 6)
 
 
 class GoogleTableDataManager:
     RESULT_TEMPLATE = "Детали из {steel_type} " \
                       "толщиной {steel_depth} мм - {answer}"
-    CASES: List[Tuple[Callable[[TableData, CellTemplate], bool], int]] = [
-        (lambda data, ts: data.user_cell_color == ts[PaperFormat.A5], 8),
-        (
-            lambda data, ts: data.user_cell_color == ts[
-                PaperFormat.A3
-            ] and data.user_f_row_color == ts[PaperFormat.A4],
-            6
-        ),
-        (lambda data, ts: data.user_cell_color == ts[PaperFormat.A4], 7),
-        (
-            lambda data, ts: data.user_cell_color == ts[
-                PaperFormat.A3
-            ] and data.user_f_row_color == ts[PaperFormat.A3],
-            5
-        ),
+    RULES: List[Rule] = [
+        (PaperFormat.A5, None, 8),
+        (PaperFormat.A3, PaperFormat.A4, 6),
+        (PaperFormat.A4, None, 7),
+        (PaperFormat.A3, PaperFormat.A3, 5),
     ]
     DEFAULT_ANSWER_NUMBER = 4
 
@@ -115,17 +106,27 @@ class GoogleTableDataManager:
     @cached_property
     def _document(self) -> Spreadsheet:
         logger.debug(f"Get worksheet '{settings.DOCUMENT_NAME}'")
+        if settings.DOCUMENT_ID:
+            return self._client.open_by_key(settings.DOCUMENT_ID)
         return self._client.open(settings.DOCUMENT_NAME)
 
     @cached_property
-    def search_sheet(self) -> Worksheet:
-        logger.debug(f"Get worksheet '{settings.SEARCH_SHEET_NAME}'")
-        return self._document.worksheet(settings.SEARCH_SHEET_NAME)
+    def sheet_generation(self) -> int:
+        return get_sheet_generation()
+
+    @cached_property
+    def search_snapshot(self) -> SheetSnapshot:
+        return get_snapshot(
+            settings.SEARCH_SHEET_NAME,
+            self.sheet_generation,
+            lambda: SheetSnapshot.load(
+                self._document, settings.SEARCH_SHEET_NAME
+            ),
+        )
 
     @cached_property
-    def answer_sheet(self) -> Worksheet:
-        logger.debug(f"Get worksheet '{settings.ANSWER_SHEET_NAME}'")
-        return self._document.worksheet(settings.ANSWER_SHEET_NAME)
+    def order_index(self) -> OrderIndex:
+        return get_order_index(self.search_snapshot, self.sheet_generation)
 
     @cached_property
     def cell_templates(self):
@@ -137,64 +138,109 @@ class GoogleTableDataManager:
         logger.debug("Get answers list")
         return self._get_answers_list()
 
-    @cached_method(get_template_cache_key, settings.TEMPLATES_CACHE_TTL)
+    @cached_property
+    def decision_table(self) -> DecisionTable:
+        return get_decision_table(
+            self.RULES, self.cell_templates, self.DEFAULT_ANSWER_NUMBER
+        )
+
+    @cached_method(
+        get_template_cache_key,
+        settings.TEMPLATES_CACHE_TTL,
+        stale_timeout=settings.TEMPLATES_STALE_TTL,
+        local=True,
+        version_key=SHEET_GENERATION_CACHE_KEY,
+    )
     def _get_cell_templates(self) -> CellTemplate:
-        templates = {}
-        for paper_format in PaperFormat:
-            templates[paper_format] = get_format_safe(
-                get_user_entered_format,
-                self.answer_sheet,
-                paper_format.value
-            ).backgroundColor
+        colors = get_background_colors(self._document, [
+            (settings.ANSWER_SHEET_NAME, paper_format.value)
+            for paper_format in PaperFormat
+        ])
         logger.debug("Get cell templates")
-        return templates
-
-    @cached_method(get_answer_list_cache_key, settings.ANSWERS_LIST_TTL)
+        return {
+            paper_format: colors[
+                settings.ANSWER_SHEET_NAME, paper_format.value
+            ]
+            for paper_format in PaperFormat
+        }
+
+    @cached_method(
+        get_answer_list_cache_key,
+        settings.ANSWERS_LIST_TTL,
+        stale_timeout=settings.ANSWERS_LIST_STALE_TTL,
+        local=True,
+        version_key=SHEET_GENERATION_CACHE_KEY,
+    )
     def _get_answers_list(self) -> list:
         logger.debug("Get answers list from server")
-        return self.answer_sheet.col_values(4)
+        data = self._document.values_get(
+            ANSWERS_RANGE.format(title=settings.ANSWER_SHEET_NAME),
+            params={"majorDimension": "COLUMNS", "fields": VALUES_FIELDS},
+        )
+        return data.get("values", [[]])[0]
 
     def get_answer_number(self, table_data: TableData) -> int:
-        for case, answer_number in self.CASES:
-            if case(table_data, self.cell_templates):
-                return answer_number
-        return self.DEFAULT_ANSWER_NUMBER
-
-    @cached_method(get_orders_cache_key, settings.ORDERS_TTL)
+        return self.decision_table.classify(
+            table_data.user_cell_color, table_data.user_f_row_color
+        )
+
+    @cached_method(
+        get_orders_cache_key,
+        settings.ORDERS_TTL,
+        settings.ORDERS_LOCK_TIMEOUT,
+        stale_timeout=settings.ORDERS_STALE_TTL,
+        version_key=SHEET_GENERATION_CACHE_KEY,
+    )
     def process_order(self, order_id: int) -> List[str]:
-        compiled_order_id = re.compile(str(order_id))
-        orders = self.search_sheet.findall(compiled_order_id)
-        logger.debug(f"Get {len(orders)} orders")
-        results = []
-        if orders:
-            for order in map(str, orders):
-                table_data = TableData(order, self.search_sheet)
-                logger.debug(table_data)
-                answer_number = self.get_answer_number(table_data)
-                result = self.RESULT_TEMPLATE.format(
-                    steel_type=table_data.steel_type,
-                    steel_depth=table_data.steel_depth,
-                    answer=self.answers_list[answer_number],
-                )
-                results.append(result)
-                sleep(settings.ORDER_TIMEOUT)
-        else:
-            results.append(f"{order_id} - {self.answers_list[3]}")
-
-        return results
-
+        return self.get_order_results(order_id)
 
-@dataclass
-class FakeFormat:
-    backgroundColor: Optional[str] = None
-
-
-def get_format_safe(
-        format_getter: Callable, *args, **kwargs
-) -> Union[CellFormat, FakeFormat]:
-    format_getter = partial(format_getter, *args, **kwargs)
-    cell_format = None
-    with suppress(KeyError, AttributeError, TypeError):
-        cell_format = format_getter(*args, **kwargs)
-
-    return cell_format or FakeFormat()
+    def get_order_results(self, order_id: int) -> List[str]:
+        orders = self.order_index.lookup(int(order_id))
+        logger.debug(f"Get {len(orders)} orders")
+        if not orders:
+            return [f"{order_id} - {self.answers_list[3]}"]
+        return self.format_results(orders)
+
+    def get_all_order_results(self) -> Dict[int, List[str]]:
+        order_cells = {
+            order_id: self.order_index.lookup(order_id)
+            for order_id in self.order_index.order_ids()
+        }
+        results = iter(self.format_results([
+            order for orders in order_cells.values() for order in orders
+        ]))
+        return {
+            order_id: [next(results) for _ in orders]
+            for order_id, orders in order_cells.items()
+        }
+
+    def format_results(self, orders: List[Tuple[int, int]]) -> List[str]:
+        tables_data = [
+            TableData(order, self.search_snapshot) for order in orders
+        ]
+        answer_numbers = self.decision_table.classify_many(
+            [table_data.user_cell_color for table_data in tables_data],
+            [table_data.user_f_row_color for table_data in tables_data],
+        )
+        return [
+            self.RESULT_TEMPLATE.format(
+                steel_type=table_data.steel_type,
+                steel_depth=table_data.steel_depth,
+                answer=self.answers_list[answer_number],
+            )
+            for table_data, answer_number in zip(tables_data, answer_numbers)
+        ]
+
+    def process_orders(self, order_ids: List[int]) -> Dict[int, List[str]]:
+        # Every order is resolved against the same in-process snapshot, so
+        # a group costs one sheet read at most.
+        return {
+            order_id: self.process_order(order_id) for order_id in order_ids
+        }
+
+    async def aprocess_orders(
+            self, order_ids: List[int]
+    ) -> Dict[int, List[str]]:
+        return await sync_to_async(
+            self.process_orders, thread_sensitive=False
+        )(order_ids)
@@ -0,0 +1,60 @@
+# Standard Library
+import logging
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+# Third Party Library
+from django.conf import settings
+from gspread import Spreadsheet
+from gspread.utils import rowcol_to_a1
+from gspread_formatting import Color
+
+logger = logging.getLogger(settings.PROJECT)
+
+FORMATS_FIELDS = (
+    "sheets(properties.title,data(startRow,startColumn,"
+    "rowData.values.userEnteredFormat.backgroundColor))"
+)
+
+CellReference = Tuple[str, str]
+
+
+def get_background_colors(
+        document: Spreadsheet, cells: List[CellReference]
+) -> Dict[CellReference, Optional[Color]]:
+    colors: Dict[CellReference, Optional[Color]] = dict.fromkeys(cells)
+    if not cells:
+        return colors
+
+    logger.debug(f"Get background colors of {len(cells)} cells")
+    metadata = document.fetch_sheet_metadata(params={
+        "ranges": [f"'{title}'!{address}" for title, address in cells],
+        "fields": FORMATS_FIELDS,
+    })
+    for sheet in metadata.get("sheets", []):
+        title = sheet["properties"]["title"]
+        for grid_data in sheet.get("data", []):
+            start_row = grid_data.get("startRow", 0)
+            start_column = grid_data.get("startColumn", 0)
+            for row_offset, row_data in enumerate(
+                    grid_data.get("rowData", [])
+            ):
+                for column_offset, cell_data in enumerate(
+                        row_data.get("values", [])
+                ):
+                    address = rowcol_to_a1(
+                        start_row + row_offset + 1,
+                        start_column + column_offset + 1,
+                    )
+                    background_color = cell_data.get(
+                        "userEnteredFormat", {}
+                    ).get("backgroundColor")
+                    if (title, address) in colors and background_color:
+                        colors[title, address] = Color.from_props(
+                            background_color
+                        )
+    return colors
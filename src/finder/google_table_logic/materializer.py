@@ -0,0 +1,81 @@
+# Standard Library
+import logging
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+# Third Party Library
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.timezone import now
+
+# Application Library
+from finder.google_table_logic.constants import (
+    MATERIALIZED_GENERATION_CACHE_KEY,
+)
+from finder.google_table_logic.data_manager import GoogleTableDataManager
+from finder.google_table_logic.revision import get_sheet_generation
+from finder.models import OrderAnswer
+
+logger = logging.getLogger(settings.PROJECT)
+
+
+class OrderMaterializer:
+    def __init__(self):
+        self.generation: Optional[int] = None
+
+    def materialize(self):
+        generation = get_sheet_generation()
+        data_manager = GoogleTableDataManager()
+        answers = data_manager.get_all_order_results()
+        existing = dict(
+            OrderAnswer.objects.values_list("order_id", "results")
+        )
+
+        created = [
+            OrderAnswer(order_id=order_id, results=results)
+            for order_id, results in answers.items()
+            if order_id not in existing
+        ]
+        updated = list(OrderAnswer.objects.filter(order_id__in=[
+            order_id for order_id, results in answers.items()
+            if order_id in existing and existing[order_id] != results
+        ]))
+        for order_answer in updated:
+            order_answer.results = answers[order_answer.order_id]
+            order_answer.updated_at = now()
+        removed = existing.keys() - answers.keys()
+
+        with transaction.atomic():
+            OrderAnswer.objects.bulk_create(
+                created, batch_size=settings.MATERIALIZER_BATCH_SIZE
+            )
+            OrderAnswer.objects.bulk_update(
+                updated,
+                ["results", "updated_at"],
+                batch_size=settings.MATERIALIZER_BATCH_SIZE,
+            )
+            OrderAnswer.objects.filter(order_id__in=removed).delete()
+        cache.set(MATERIALIZED_GENERATION_CACHE_KEY, generation, None)
+        self.generation = generation
+        logger.info(
+            f"Materialized generation {generation}: {len(created)} created, "
+            f"{len(updated)} updated, {len(removed)} removed"
+        )
+
+    def materialize_if_changed(self) -> bool:
+        if self.generation == get_sheet_generation():
+            return False
+        self.materialize()
+        return True
+
+
+def get_materialized_results(order_ids: List[int]) -> Dict[int, List[str]]:
+    if cache.get(MATERIALIZED_GENERATION_CACHE_KEY) != get_sheet_generation():
+        return {}
+    return dict(OrderAnswer.objects.filter(
+        order_id__in=order_ids
+    ).values_list("order_id", "results"))
@@ -0,0 +1,114 @@
+# Standard Library
+import logging
+import re
+from collections import defaultdict
+from threading import Lock
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+# Third Party Library
+from django.conf import settings
+
+# Application Library
+from finder.google_table_logic.snapshot import (
+    SheetCell,
+    SheetSnapshot,
+)
+
+logger = logging.getLogger(settings.PROJECT)
+
+ORDER_ID_PATTERN = re.compile(r"(?<!\d)\d{7}(?!\d)")
+
+CellCoordinates = Tuple[int, int]
+
+order_index = None
+
+
+class OrderIndex:
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.generation: Optional[int] = None
+        self._snapshot: Optional[SheetSnapshot] = None
+        self._lock = Lock()
+        self._orders: Dict[int, Set[CellCoordinates]] = defaultdict(set)
+        self._rows: Dict[int, List[Tuple[int, CellCoordinates]]] = {}
+        self._row_digests: Dict[int, int] = {}
+
+    def lookup(self, order_id: int) -> List[CellCoordinates]:
+        with self._lock:
+            return sorted(self._orders.get(order_id, ()))
+
+    def order_ids(self) -> List[int]:
+        with self._lock:
+            return list(self._orders)
+
+    def refresh(
+            self, snapshot: SheetSnapshot, generation: Optional[int] = None
+    ):
+        # Snapshots are shared until the sheet generation changes, so rows
+        # are only hashed when a new snapshot shows up.
+        is_indexed = snapshot is self._snapshot
+        if is_indexed and generation == self.generation:
+            return
+
+        row_digests = {
+            row_index: get_row_digest(row)
+            for row_index, row in enumerate(snapshot.rows, start=1)
+        }
+        version = hash(tuple(row_digests.values()))
+        if version == self.version:
+            self._snapshot, self.generation = snapshot, generation
+            return
+
+        with self._lock:
+            changed_rows = [
+                row_index for row_index, digest in row_digests.items()
+                if self._row_digests.get(row_index) != digest
+            ]
+            removed_rows = self._row_digests.keys() - row_digests.keys()
+            for row_index in removed_rows:
+                self._drop_row(row_index)
+            for row_index in changed_rows:
+                self._drop_row(row_index)
+                self._index_row(row_index, snapshot.rows[row_index - 1])
+            self._row_digests = row_digests
+            self.version = version
+            self._snapshot, self.generation = snapshot, generation
+        logger.debug(
+            f"Order index refreshed: {len(changed_rows)} rows changed, "
+            f"{len(removed_rows)} rows removed"
+        )
+
+    def _index_row(self, row_index: int, row: List[SheetCell]):
+        entries = []
+        for column_index, cell in enumerate(row, start=1):
+            for order_id in ORDER_ID_PATTERN.findall(cell.value or ""):
+                entries.append((int(order_id), (row_index, column_index)))
+        for order_id, coordinates in entries:
+            self._orders[order_id].add(coordinates)
+        self._rows[row_index] = entries
+
+    def _drop_row(self, row_index: int):
+        for order_id, coordinates in self._rows.pop(row_index, []):
+            cells = self._orders[order_id]
+            cells.discard(coordinates)
+            if not cells:
+                del self._orders[order_id]
+
+
+def get_row_digest(row: List[SheetCell]) -> int:
+    return hash(tuple(cell.value for cell in row))
+
+
+def get_order_index(
+        snapshot: SheetSnapshot, generation: Optional[int] = None
+) -> OrderIndex:
+    global order_index
+    order_index = order_index or OrderIndex()
+    order_index.refresh(snapshot, generation)
+    return order_index
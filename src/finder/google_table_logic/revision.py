@@ -0,0 +1,82 @@
+# Standard Library
+import logging
+from typing import Optional
+
+# Third Party Library
+from django.conf import settings
+from django.core.cache import cache
+
+# Application Library
+from finder.google_table_logic.client import (
+    GSpreadClient,
+    get_gspread_client,
+)
+from finder.google_table_logic.constants import (
+    DRIVE_FILE_URL,
+    DRIVE_REVISION_FIELDS,
+    SHEET_GENERATION_CACHE_KEY,
+    SHEET_REVISION_CACHE_KEY,
+    SHEET_REVISION_POLL_CACHE_KEY,
+)
+from helpers import cache_versions
+
+logger = logging.getLogger(settings.PROJECT)
+
+
+class RevisionWatcher:
+    def __init__(self, client: Optional[GSpreadClient] = None):
+        self._client = client
+        self._document_id: Optional[str] = settings.DOCUMENT_ID
+
+    @property
+    def client(self) -> GSpreadClient:
+        self._client = self._client or get_gspread_client()
+        return self._client
+
+    @property
+    def document_id(self) -> str:
+        if not self._document_id:
+            self._document_id = self.client.open(settings.DOCUMENT_NAME).id
+        return self._document_id
+
+    def get_revision(self) -> str:
+        response = self.client.request(
+            "get",
+            DRIVE_FILE_URL.format(
+                base_url=settings.GOOGLE_DRIVE_API_URL,
+                file_id=self.document_id,
+            ),
+            params={"fields": DRIVE_REVISION_FIELDS},
+        )
+        data = response.json()
+        return f"{data.get('version')}:{data.get('modifiedTime')}"
+
+    def poll(self) -> bool:
+        revision = self.get_revision()
+        previous_revision = cache.get(SHEET_REVISION_CACHE_KEY)
+        if revision == previous_revision:
+            return False
+
+        cache.set(SHEET_REVISION_CACHE_KEY, revision, None)
+        logger.info(f"Document revision changed to {revision}")
+        cache_versions.bump(SHEET_GENERATION_CACHE_KEY)
+        return True
+
+    def poll_if_due(self) -> bool:
+        # Only one process polls per interval, the others rely on the
+        # shared generation stamp.
+        if not cache.add(
+                SHEET_REVISION_POLL_CACHE_KEY,
+                1,
+                settings.SHEET_REVISION_POLL_INTERVAL,
+        ):
+            return False
+        try:
+            return self.poll()
+        except Exception as exc:
+            logger.error(f"Failed to poll document revision: {exc}")
+            return False
+
+
+def get_sheet_generation() -> int:
+    return cache_versions.get(SHEET_GENERATION_CACHE_KEY)
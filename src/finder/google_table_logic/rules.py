@@ -0,0 +1,117 @@
+# Standard Library
+import logging
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# Third Party Library
+from django.conf import settings
+from gspread_formatting import Color
+
+# Application Library
+from constants import PaperFormat
+
+logger = logging.getLogger(settings.PROJECT)
+
+COLOR_PRECISION = 4
+
+ColorKey = Optional[Tuple[float, float, float, float]]
+Rule = Tuple[PaperFormat, Optional[PaperFormat], int]
+CellTemplate = Dict[PaperFormat, Optional[Color]]
+
+decision_table = None
+
+
+def get_color_key(color: Optional[Color]) -> ColorKey:
+    # The API omits zero components and opaque alpha, so missing fields are
+    # filled in before rounding away float noise.
+    if color is None:
+        return None
+    return (
+        round(color.red or 0, COLOR_PRECISION),
+        round(color.green or 0, COLOR_PRECISION),
+        round(color.blue or 0, COLOR_PRECISION),
+        round(1 if color.alpha is None else color.alpha, COLOR_PRECISION),
+    )
+
+
+class DecisionTable:
+    def __init__(
+            self,
+            rules: List[Rule],
+            templates: CellTemplate,
+            default: int,
+    ):
+        self.default = default
+        self.template_key = get_templates_key(templates)
+        self._by_cell: Dict[ColorKey, int] = {}
+        self._by_cell_and_row: Dict[Tuple[ColorKey, ColorKey], int] = {}
+
+        # Rules are compiled in priority order: a rule never overrides an
+        # earlier one that matches the same colors.
+        for cell_format, row_format, answer_number in rules:
+            cell_key = get_color_key(templates[cell_format])
+            if cell_key in self._by_cell:
+                continue
+            if row_format is None:
+                self._by_cell[cell_key] = answer_number
+            else:
+                self._by_cell_and_row.setdefault(
+                    (cell_key, get_color_key(templates[row_format])),
+                    answer_number,
+                )
+
+    def classify(
+            self,
+            cell_color: Optional[Color],
+            row_color: Optional[Color],
+    ) -> int:
+        return self.classify_many([cell_color], [row_color])[0]
+
+    def classify_many(
+            self,
+            cell_colors: Sequence[Optional[Color]],
+            row_colors: Sequence[Optional[Color]],
+    ) -> List[int]:
+        by_cell, by_cell_and_row = self._by_cell, self._by_cell_and_row
+        answer_numbers = []
+        for cell_color, row_color in zip(cell_colors, row_colors):
+            cell_key = get_color_key(cell_color)
+            answer_number = by_cell_and_row.get(
+                (cell_key, get_color_key(row_color))
+            )
+            if answer_number is None:
+                answer_number = by_cell.get(cell_key, self.default)
+            answer_numbers.append(answer_number)
+        return answer_numbers
+
+
+def get_templates_key(templates: CellTemplate) -> Tuple:
+    return tuple(
+        (paper_format, get_color_key(color))
+        for paper_format, color in sorted(
+            templates.items(), key=lambda item: item[0].value
+        )
+    )
+
+
+def get_decision_table(
+        rules: List[Rule], templates: CellTemplate, default: int
+) -> DecisionTable:
+    template_key = get_templates_key(templates)
+    if decision_table and decision_table.template_key == template_key:
+        return decision_table
+    return set_decision_table(rules, templates, default)
+
+
+def set_decision_table(
+        rules: List[Rule], templates: CellTemplate, default: int
+):
+    global decision_table
+    decision_table = DecisionTable(rules, templates, default)
+    logger.debug("Compiled answer decision table")
+    return decision_table
@@ -0,0 +1,116 @@
+# Standard Library
+import logging
+from dataclasses import dataclass
+from time import time
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+# Third Party Library
+from django.conf import settings
+from gspread import Spreadsheet
+from gspread.utils import rowcol_to_a1
+from gspread_formatting import Color
+
+logger = logging.getLogger(settings.PROJECT)
+
+SNAPSHOT_FIELDS = (
+    "sheets(data(startRow,startColumn,rowData(values("
+    "formattedValue,userEnteredFormat.backgroundColor"
+    "))))"
+)
+
+
+@dataclass
+class SheetCell:
+    value: Optional[str] = None
+    background_color: Optional[Color] = None
+
+
+EMPTY_CELL = SheetCell()
+
+snapshots: Dict[str, Tuple[int, float, "SheetSnapshot"]] = {}
+
+
+class SheetSnapshot:
+    def __init__(self, title: str, rows: List[List[SheetCell]]):
+        self.title = title
+        self.rows = rows
+
+    @classmethod
+    def load(cls, document: Spreadsheet, title: str) -> "SheetSnapshot":
+        logger.debug(f"Load snapshot of worksheet '{title}'")
+        metadata = document.fetch_sheet_metadata(params={
+            "includeGridData": "true",
+            "ranges": f"'{title}'",
+            "fields": SNAPSHOT_FIELDS,
+        })
+        rows: List[List[SheetCell]] = []
+        for grid_data in metadata["sheets"][0].get("data", []):
+            start_row = grid_data.get("startRow", 0)
+            start_column = grid_data.get("startColumn", 0)
+            for row_offset, row_data in enumerate(
+                    grid_data.get("rowData", [])
+            ):
+                row_index = start_row + row_offset
+                while len(rows) <= row_index:
+                    rows.append([])
+                row = rows[row_index]
+                for column_offset, cell_data in enumerate(
+                        row_data.get("values", [])
+                ):
+                    column_index = start_column + column_offset
+                    while len(row) <= column_index:
+                        row.append(EMPTY_CELL)
+                    row[column_index] = parse_cell(cell_data)
+        return cls(title, rows)
+
+    def cell(self, row: int, column: int) -> SheetCell:
+        with_row = 0 < row <= len(self.rows)
+        cells = self.rows[row - 1] if with_row else []
+        return cells[column - 1] if 0 < column <= len(cells) else EMPTY_CELL
+
+    def value(self, row: int, column: int) -> Optional[str]:
+        return self.cell(row, column).value
+
+    def background_color(self, row: int, column: int) -> Optional[Color]:
+        return self.cell(row, column).background_color
+
+    @staticmethod
+    def address(row: int, column: int) -> str:
+        return rowcol_to_a1(row, column)
+
+
+def parse_cell(cell_data: dict) -> SheetCell:
+    background_color = cell_data.get(
+        "userEnteredFormat", {}
+    ).get("backgroundColor")
+    return SheetCell(
+        value=cell_data.get("formattedValue"),
+        background_color=background_color and Color.from_props(
+            background_color
+        ),
+    )
+
+
+def get_snapshot(
+        title: str,
+        generation: int,
+        loader: Callable[[], SheetSnapshot],
+) -> SheetSnapshot:
+    # Snapshots are reused by the process until the sheet generation
+    # changes; the TTL only bounds staleness if nobody watches revisions.
+    cached = snapshots.get(title)
+    if cached is not None:
+        cached_generation, loaded_at, snapshot = cached
+        is_expired = time() - loaded_at >= settings.SHEET_SNAPSHOT_TTL
+        if cached_generation == generation and not is_expired:
+            return snapshot
+
+    snapshot = loader()
+    snapshots[title] = (generation, time(), snapshot)
+    return snapshot
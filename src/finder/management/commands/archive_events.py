@@ -0,0 +1,32 @@
+# Standard Library
+from datetime import timedelta
+
+# Third Party Library
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils.timezone import now
+
+# Application Library
+from finder.event_logic.archive import archive_events
+
+
+class Command(BaseCommand):
+    help = "Move finished and failed events to the archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.EVENT_RETENTION_DAYS,
+            help="Keep completed events in the queue table for this long",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EVENT_ARCHIVE_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        before = now() - timedelta(days=options["days"])
+        archived = archive_events(before, options["batch_size"])
+        self.stdout.write(f"Archived {archived} events")
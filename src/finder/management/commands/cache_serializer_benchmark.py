@@ -0,0 +1,86 @@
+# Standard Library
+from time import (
+    perf_counter,
+    time,
+)
+from typing import (
+    Any,
+    Dict,
+)
+
+# Third Party Library
+from django.core.management import BaseCommand
+from gspread_formatting import Color
+
+# Application Library
+from cache_serializers import (
+    CompactSerializer,
+    PickleSerializer,
+)
+from constants import PaperFormat
+from finder.benchmark.servers import ANSWERS
+from finder.google_table_logic.data_manager import GoogleTableDataManager
+from helpers import CacheEntry
+
+
+def get_payloads() -> Dict[str, Any]:
+    order_results = [
+        GoogleTableDataManager.RESULT_TEMPLATE.format(
+            steel_type="Ст3 горячекатаная",
+            steel_depth=depth,
+            answer=ANSWERS[depth % len(ANSWERS)],
+        )
+        for depth in range(1, 9)
+    ]
+    templates = {
+        PaperFormat.A5: Color(0.8509804, 0.91764706, 0.827451),
+        PaperFormat.A4: Color(1, 0.9490196, 0.8),
+        PaperFormat.A3: Color(0.95686275, 0.8, 0.8, 1),
+    }
+    answers_list = ["", "", "", *ANSWERS]
+    return {
+        "order results": CacheEntry(order_results, time(), 0.8),
+        "cell templates": CacheEntry(templates, time(), 0.3),
+        "answers list": CacheEntry(answers_list, time(), 0.5),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare cache serializers by stored size and encode/decode time"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        serializers = {
+            "pickle": PickleSerializer(),
+            "compact": CompactSerializer(),
+            "compact (no zlib)": CompactSerializer(
+                compress_threshold=float("inf")  # type: ignore
+            ),
+        }
+        self.stdout.write(
+            f"{'payload':<16}{'serializer':<20}{'bytes':>8}"
+            f"{'encode, us':>12}{'decode, us':>12}"
+        )
+        for payload_name, payload in get_payloads().items():
+            for serializer_name, serializer in serializers.items():
+                data = serializer.dumps(payload)
+                assert serializer.loads(data) == payload
+
+                started_at = perf_counter()
+                for _ in range(iterations):
+                    serializer.dumps(payload)
+                encode_time = (perf_counter() - started_at) / iterations
+
+                started_at = perf_counter()
+                for _ in range(iterations):
+                    serializer.loads(data)
+                decode_time = (perf_counter() - started_at) / iterations
+
+                self.stdout.write(
+                    f"{payload_name:<16}{serializer_name:<20}{len(data):>8}"
+                    f"{encode_time * 10 ** 6:>12.1f}"
+                    f"{decode_time * 10 ** 6:>12.1f}"
+                )
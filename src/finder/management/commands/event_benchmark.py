@@ -0,0 +1,101 @@
+# Third Party Library
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.test.utils import override_settings
+
+# Application Library
+from finder.benchmark.driver import (
+    BenchmarkReport,
+    EventBenchmark,
+)
+
+BENCHMARK_CACHE_PREFIX = "BENCHMARK"
+BENCHMARK_DOCUMENT_ID = "benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Push webhooks through the event pipeline against local fake Google "
+        "Sheets and Telegram servers and report throughput. Events are "
+        "written to the configured database, run it against a scratch one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=1000)
+        parser.add_argument("--orders", type=int, default=5000)
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Run the asyncio event worker",
+        )
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--concurrency", type=int)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.05,
+            help="Seconds every fake API call takes",
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0,
+            help="Share of fake API calls answered with 429",
+        )
+        parser.add_argument(
+            "--google-rate-limit",
+            type=int,
+            default=settings.GOOGLE_API_RATE_LIMIT,
+        )
+        parser.add_argument("--timeout", type=float, default=300)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        benchmark = EventBenchmark(
+            options["events"],
+            options["orders"],
+            use_async=options["use_async"],
+            batch_size=options["batch_size"],
+            concurrency=options["concurrency"],
+            latency=options["latency"],
+            error_rate=options["error_rate"],
+            timeout=options["timeout"],
+            seed=options["seed"],
+        )
+        with override_settings(
+                CACHES={
+                    alias: {**config, "KEY_PREFIX": BENCHMARK_CACHE_PREFIX}
+                    for alias, config in settings.CACHES.items()
+                },
+                DOCUMENT_ID=BENCHMARK_DOCUMENT_ID,
+                GOOGLE_API_RATE_LIMIT=options["google_rate_limit"],
+        ):
+            report = benchmark.run()
+        self.write_report(report)
+
+    def write_report(self, report: BenchmarkReport):
+        self.stdout.write(
+            f"events: {report.events}, finished: {report.finished}, "
+            f"failed: {report.failed}, unfinished: {report.unfinished}"
+        )
+        self.stdout.write(
+            f"webhooks: {report.webhooks_per_second:.1f}/sec"
+        )
+        self.stdout.write(
+            f"throughput: {report.events_per_second:.1f} events/sec"
+        )
+        self.stdout.write(
+            f"time to answer: p50 {report.percentile(50):.3f} sec, "
+            f"p99 {report.percentile(99):.3f} sec"
+        )
+        self.stdout.write(
+            f"google: {report.google_calls_per_event:.3f} calls/event, "
+            f"{report.google_bytes} bytes received"
+        )
+        for endpoint, calls in sorted(report.google_calls.items()):
+            self.stdout.write(f"  {endpoint}: {calls}")
+        self.stdout.write(
+            f"telegram: {report.telegram_calls_per_event:.3f} calls/event"
+        )
+        self.stdout.write(f"quota errors: {report.quota_errors}")
@@ -0,0 +1,46 @@
+# Third Party Library
+from django.core.management import BaseCommand
+
+# Application Library
+from finder.event_logic.supervisor import WorkerSupervisor
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a pool of event workers, restart the ones that exit and scale "
+        "the pool by the depth and age of the waiting queue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-workers", type=int)
+        parser.add_argument("--max-workers", type=int)
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Run asyncio event workers",
+        )
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--concurrency", type=int)
+        parser.add_argument(
+            "--max-events",
+            type=int,
+            help="Recycle a worker after it processed this many events",
+        )
+        parser.add_argument(
+            "--max-memory",
+            type=int,
+            help="Recycle a worker once its resident memory reaches this "
+                 "many MB",
+        )
+
+    def handle(self, *args, **options):
+        WorkerSupervisor(
+            options["min_workers"],
+            options["max_workers"],
+            use_async=options["use_async"],
+            batch_size=options["batch_size"],
+            concurrency=options["concurrency"],
+            max_events=options["max_events"],
+            max_memory=options["max_memory"],
+        ).run()
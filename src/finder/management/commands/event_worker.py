@@ -1,32 +1,51 @@
 # Standard Library
-import logging
-from time import sleep
+import signal
 
 # Third Party Library
-from django.conf import settings
 from django.core.management import BaseCommand
 
 # Application Library
-from constants import EventManagerStatus
-from finder.event_logic.event_manager import EventManager
-
-logger = logging.getLogger(f"{settings.PROJECT}.worker")
+from finder.event_logic.worker import (
+    AsyncEventWorker,
+    EventWorker,
+)
 
 
 class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Process claimed events concurrently in an asyncio loop",
+        )
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--concurrency", type=int)
+        parser.add_argument(
+            "--max-events",
+            type=int,
+            help="Exit after processing this many events",
+        )
+        parser.add_argument(
+            "--max-memory",
+            type=int,
+            help="Exit once resident memory reaches this many MB",
+        )
+
     def handle(self, *args, **options):
-        while True:
-            logger.info("Start iteration")
-            event_manager = EventManager()
-            event_manager.process()
-            logger.info(
-                f"Finished to proceed event "
-                f"{event_manager.event.pk if event_manager.event else ''}: "
-                f"{event_manager.status}"
+        if options["use_async"]:
+            worker = AsyncEventWorker(
+                options["batch_size"],
+                options["concurrency"],
+                options["max_events"],
+                options["max_memory"],
+            )
+        else:
+            worker = EventWorker(
+                options["batch_size"],
+                options["max_events"],
+                options["max_memory"],
             )
-            if event_manager.status == EventManagerStatus.ERROR:
-                logger.error(
-                    f"Event {event_manager.event.pk} failed with error: "
-                    f"{event_manager.error}"
-                )
-            sleep(settings.EVENT_WORKER_TIMEOUT)
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        worker.run()
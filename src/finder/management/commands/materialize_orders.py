@@ -0,0 +1,37 @@
+# Standard Library
+import logging
+from time import sleep
+
+# Third Party Library
+from django.conf import settings
+from django.core.management import BaseCommand
+
+# Application Library
+from finder.google_table_logic.materializer import OrderMaterializer
+from finder.google_table_logic.revision import RevisionWatcher
+
+logger = logging.getLogger(f"{settings.PROJECT}.worker")
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Materialize the current sheet generation and exit",
+        )
+
+    def handle(self, *args, **options):
+        materializer = OrderMaterializer()
+        if options["once"]:
+            materializer.materialize()
+            return
+
+        watcher = RevisionWatcher()
+        while True:
+            watcher.poll_if_due()
+            try:
+                materializer.materialize_if_changed()
+            except Exception as exc:
+                logger.error(f"Failed to materialize orders: {exc}")
+            sleep(settings.SHEET_REVISION_POLL_INTERVAL)
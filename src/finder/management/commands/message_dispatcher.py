@@ -0,0 +1,13 @@
+# Third Party Library
+from django.core.management import BaseCommand
+
+# Application Library
+from finder.telegram_logic.dispatcher import MessageDispatcher
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int)
+
+    def handle(self, *args, **options):
+        MessageDispatcher(options["batch_size"]).run()
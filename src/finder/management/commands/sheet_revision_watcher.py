@@ -0,0 +1,17 @@
+# Standard Library
+from time import sleep
+
+# Third Party Library
+from django.conf import settings
+from django.core.management import BaseCommand
+
+# Application Library
+from finder.google_table_logic.revision import RevisionWatcher
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **options):
+        watcher = RevisionWatcher()
+        while True:
+            watcher.poll_if_due()
+            sleep(settings.SHEET_REVISION_POLL_INTERVAL)
@@ -0,0 +1,38 @@
+# Third Party Library
+from django.db import migrations
+
+CREATE_NOTIFY_TRIGGER = """
+CREATE OR REPLACE FUNCTION finder_event_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('finder_event', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER finder_event_notify
+    AFTER INSERT ON finder_event
+    FOR EACH STATEMENT EXECUTE PROCEDURE finder_event_notify();
+
+CREATE TRIGGER finder_event_waiting_notify
+    AFTER UPDATE OF status ON finder_event
+    FOR EACH ROW
+    WHEN (NEW.status = 'WAITING' AND OLD.status <> 'WAITING')
+    EXECUTE PROCEDURE finder_event_notify();
+"""
+
+DROP_NOTIFY_TRIGGER = """
+DROP TRIGGER IF EXISTS finder_event_waiting_notify ON finder_event;
+DROP TRIGGER IF EXISTS finder_event_notify ON finder_event;
+DROP FUNCTION IF EXISTS finder_event_notify();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_NOTIFY_TRIGGER, DROP_NOTIFY_TRIGGER),
+    ]
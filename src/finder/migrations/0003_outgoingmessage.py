@@ -0,0 +1,53 @@
+# Generated by Django 3.1.5 on 2026-10-18 13:42
+
+# Third Party Library
+from django.db import (
+    migrations,
+    models,
+)
+
+CREATE_NOTIFY_TRIGGER = """
+CREATE OR REPLACE FUNCTION finder_outgoingmessage_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('finder_outgoing_message', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER finder_outgoingmessage_notify
+    AFTER INSERT ON finder_outgoingmessage
+    FOR EACH STATEMENT EXECUTE PROCEDURE finder_outgoingmessage_notify();
+"""
+
+DROP_NOTIFY_TRIGGER = """
+DROP TRIGGER IF EXISTS finder_outgoingmessage_notify ON finder_outgoingmessage;
+DROP FUNCTION IF EXISTS finder_outgoingmessage_notify();
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0002_event_notify_trigger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingMessage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_id', models.IntegerField(verbose_name='Chat id')),
+                ('text', models.TextField(verbose_name='Text')),
+                ('status', models.CharField(choices=[('WAITING', 'Waiting'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='WAITING', max_length=255, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('error', models.CharField(blank=True, max_length=255, null=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent at')),
+                ('next_attempt_at', models.DateTimeField(blank=True, null=True, verbose_name='Next attempt at')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.RunSQL(CREATE_NOTIFY_TRIGGER, DROP_NOTIFY_TRIGGER),
+    ]
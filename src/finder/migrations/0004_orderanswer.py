@@ -0,0 +1,29 @@
+# Generated by Django 3.1.5 on 2026-10-18 13:48
+
+# Third Party Library
+from django.db import (
+    migrations,
+    models,
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0003_outgoingmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderAnswer',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.IntegerField(unique=True, verbose_name='Order id')),
+                ('results', models.JSONField(verbose_name='Results')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+            ],
+            options={
+                'ordering': ['order_id'],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.1.5 on 2026-10-18 14:00
+
+# Third Party Library
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import (
+    migrations,
+    models,
+)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('finder', '0004_orderanswer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEvent',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False, verbose_name='Event id')),
+                ('chat_id', models.IntegerField(verbose_name='Chat id')),
+                ('order_id', models.IntegerField(verbose_name='Order id')),
+                ('status', models.CharField(choices=[('WAITING', 'Waiting'), ('IN_PROGRESS', 'In progress'), ('FINISHED', 'Finished'), ('FAILED', 'Failed')], max_length=255, verbose_name='Status')),
+                ('error', models.CharField(blank=True, max_length=255, null=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(verbose_name='Updated at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished at')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archived at')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(condition=models.Q(status__in=['WAITING', 'IN_PROGRESS']), fields=['created_at'], name='finder_event_queue_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(condition=models.Q(status='WAITING'), fields=['order_id'], name='finder_event_order_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.1.5 on 2026-10-18 14:01
+
+# Third Party Library
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import (
+    migrations,
+    models,
+)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('finder', '0005_event_queue_indexes_archivedevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedevent',
+            name='batch_id',
+            field=models.UUIDField(blank=True, null=True, verbose_name='Batch id'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='batch_id',
+            field=models.UUIDField(blank=True, null=True, verbose_name='Batch id'),
+        ),
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(condition=models.Q(status='WAITING'), fields=['batch_id'], name='finder_event_batch_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.1.5 on 2026-10-18 14:03
+
+# Third Party Library
+from django.db import (
+    migrations,
+    models,
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0006_event_batch_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, verbose_name='Attempts'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Next attempt at'),
+        ),
+        migrations.AddField(
+            model_name='archivedevent',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, verbose_name='Attempts'),
+        ),
+        migrations.AddField(
+            model_name='archivedevent',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Next attempt at'),
+        ),
+    ]
@@ -1,3 +1,6 @@
+# Standard Library
+from datetime import timedelta
+
 # Third Party Library
 from django.db import models
 from django.utils.timezone import now
@@ -15,6 +18,7 @@ class Event(models.Model):
 
     chat_id = models.IntegerField(_("Chat id"))
     order_id = models.IntegerField(_("Order id"))
+    batch_id = models.UUIDField(_("Batch id"), null=True, blank=True)
     status = models.CharField(
         _("Status"),
         max_length=255,
@@ -33,15 +37,45 @@ class Event(models.Model):
         auto_now=True,
     )
     finished_at = models.DateTimeField(_("Finished at"), null=True, blank=True)
+    attempts = models.PositiveIntegerField(_("Attempts"), default=0)
+    next_attempt_at = models.DateTimeField(
+        _("Next attempt at"), null=True, blank=True
+    )
 
     class Meta:
         ordering = ["created_at"]
+        # Queue indexes only cover unfinished events, so they stay small no
+        # matter how much history the table keeps.
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                name="finder_event_queue_idx",
+                condition=models.Q(status__in=["WAITING", "IN_PROGRESS"]),
+            ),
+            models.Index(
+                fields=["order_id"],
+                name="finder_event_order_queue_idx",
+                condition=models.Q(status="WAITING"),
+            ),
+            models.Index(
+                fields=["batch_id"],
+                name="finder_event_batch_queue_idx",
+                condition=models.Q(status="WAITING"),
+            ),
+        ]
 
     def set_error(self, exc):
         self.status = self.EventStatus.FAILED
         self.error = str(exc)[:self.ERROR_MAX_LENGTH]
         self.save()
 
+    def set_retry(self, exc, delay: float):
+        self.attempts += 1
+        self.status = self.EventStatus.WAITING
+        self.error = str(exc)[:self.ERROR_MAX_LENGTH]
+        self.next_attempt_at = now() + timedelta(seconds=delay)
+        self.save()
+
     def set_success(self):
         self.status = self.EventStatus.FINISHED
         self.finished_at = now()
@@ -50,3 +84,100 @@ class Event(models.Model):
     def set_in_progress(self):
         self.status = self.EventStatus.IN_PROGRESS
         self.save()
+
+
+class OutgoingMessage(models.Model):
+    ERROR_MAX_LENGTH = 255
+
+    class MessageStatus(models.TextChoices):
+        WAITING = "WAITING", _("Waiting")
+        SENDING = "SENDING", _("Sending")
+        SENT = "SENT", _("Sent")
+        FAILED = "FAILED", _("Failed")
+
+    chat_id = models.IntegerField(_("Chat id"))
+    text = models.TextField(_("Text"))
+    status = models.CharField(
+        _("Status"),
+        max_length=255,
+        choices=MessageStatus.choices,
+        default=MessageStatus.WAITING,
+    )
+    attempts = models.PositiveIntegerField(_("Attempts"), default=0)
+    error = models.CharField(
+        _("Error"), max_length=ERROR_MAX_LENGTH, null=True, blank=True
+    )
+    created_at = models.DateTimeField(
+        _("Created at"),
+        auto_now_add=True,
+    )
+    updated_at = models.DateTimeField(
+        _("Updated at"),
+        auto_now=True,
+    )
+    sent_at = models.DateTimeField(_("Sent at"), null=True, blank=True)
+    next_attempt_at = models.DateTimeField(
+        _("Next attempt at"), null=True, blank=True
+    )
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def set_sent(self):
+        self.status = self.MessageStatus.SENT
+        self.attempts += 1
+        self.sent_at = now()
+        self.save()
+
+    def set_error(self, exc, max_attempts: int, delay: float = 0):
+        self.attempts += 1
+        self.status = (
+            self.MessageStatus.WAITING
+            if self.attempts < max_attempts else self.MessageStatus.FAILED
+        )
+        self.error = str(exc)[:self.ERROR_MAX_LENGTH]
+        self.next_attempt_at = now() + timedelta(seconds=delay)
+        self.save()
+
+    def set_waiting(self):
+        self.status = self.MessageStatus.WAITING
+        self.save()
+
+
+class OrderAnswer(models.Model):
+    order_id = models.IntegerField(_("Order id"), unique=True)
+    results = models.JSONField(_("Results"))
+    updated_at = models.DateTimeField(
+        _("Updated at"),
+        auto_now=True,
+    )
+
+    class Meta:
+        ordering = ["order_id"]
+
+
+class ArchivedEvent(models.Model):
+    id = models.IntegerField(_("Event id"), primary_key=True)
+    chat_id = models.IntegerField(_("Chat id"))
+    order_id = models.IntegerField(_("Order id"))
+    batch_id = models.UUIDField(_("Batch id"), null=True, blank=True)
+    status = models.CharField(
+        _("Status"), max_length=255, choices=Event.EventStatus.choices
+    )
+    error = models.CharField(
+        _("Error"), max_length=Event.ERROR_MAX_LENGTH, null=True, blank=True
+    )
+    created_at = models.DateTimeField(_("Created at"))
+    updated_at = models.DateTimeField(_("Updated at"))
+    finished_at = models.DateTimeField(_("Finished at"), null=True, blank=True)
+    attempts = models.PositiveIntegerField(_("Attempts"), default=0)
+    next_attempt_at = models.DateTimeField(
+        _("Next attempt at"), null=True, blank=True
+    )
+    archived_at = models.DateTimeField(
+        _("Archived at"),
+        auto_now_add=True,
+    )
+
+    class Meta:
+        ordering = ["created_at"]
@@ -1,4 +1,12 @@
+# Standard Library
+from typing import List
+from uuid import (
+    UUID,
+    uuid4,
+)
+
 # Third Party Library
+from django.conf import settings
 from rest_framework import serializers
 
 # Application Library
@@ -6,14 +14,33 @@ from finder.models import Event
 from helpers import IntegerLengthValidator
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventBatchSerializer(serializers.Serializer):
     chat_id = serializers.IntegerField()
-    order_id = serializers.IntegerField(
-        validators=[
-            IntegerLengthValidator(length=7),
-        ]
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(
+            validators=[
+                IntegerLengthValidator(length=7),
+            ]
+        ),
+        min_length=1,
+        max_length=settings.MESSAGE_MAX_ORDERS,
     )
+    batch_id = serializers.UUIDField(read_only=True)
+
+    def validate_order_ids(self, value: List[int]) -> List[int]:
+        return list(dict.fromkeys(value))
+
+    def build_events(self, batch_id: UUID) -> List[Event]:
+        return [
+            Event(
+                chat_id=self.validated_data["chat_id"],
+                order_id=order_id,
+                batch_id=batch_id,
+            )
+            for order_id in self.validated_data["order_ids"]
+        ]
 
-    class Meta:
-        model = Event
-        fields = ("chat_id", "order_id")
+    def create(self, validated_data: dict) -> dict:
+        batch_id = uuid4()
+        Event.objects.bulk_create(self.build_events(batch_id))
+        return {**validated_data, "batch_id": batch_id}
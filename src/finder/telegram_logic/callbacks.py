@@ -1,11 +1,17 @@
 # Standard Library
-from typing import Dict
+from typing import (
+    Any,
+    Dict,
+)
 
 # Application Library
+from finder.models import OutgoingMessage
 from finder.telegram_logic.client import TelegramClient
 from finder.telegram_logic.constants import ERROR_LENGTH
 
 __all__ = (
+    "build_success_message",
+    "build_error_message",
     "event_success_callback",
     "event_error_callback",
 )
@@ -14,16 +20,24 @@ __all__ = (
 SUCCESS_MESSAGE_TEMPLATE = "Event searching order {order_id} has been created"
 
 
-def event_success_callback(data: Dict[int, int]):
-    chat_id = data["chat_id"]  # type: ignore
-    order_id = data["order_id"]  # type: ignore
+def build_success_message(data: Dict[str, Any]) -> OutgoingMessage:
+    chat_id = data["chat_id"]
+    order_ids = data["order_ids"]
     client = TelegramClient(chat_id)
-    client.send_message(
-        order_id=order_id,
+    return client.build_message(
+        order_id=", ".join(str(order_id) for order_id in order_ids),
         template=SUCCESS_MESSAGE_TEMPLATE
     )
 
 
-def event_error_callback(chat_id, exc: Exception):
+def build_error_message(chat_id, exc: Exception) -> OutgoingMessage:
     client = TelegramClient(chat_id)
-    client.send_message(message=str(exc)[:ERROR_LENGTH])
+    return client.build_message(message=str(exc)[:ERROR_LENGTH])
+
+
+def event_success_callback(data: Dict[str, Any]):
+    build_success_message(data).save()
+
+
+def event_error_callback(chat_id, exc: Exception):
+    build_error_message(chat_id, exc).save()
@@ -1,6 +1,23 @@
+# Standard Library
+import logging
+from time import sleep
+from typing import (
+    List,
+    Optional,
+)
+
 # Third Party Library
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+# Application Library
+from finder.models import OutgoingMessage
+from finder.telegram_logic.constants import RETRY_STATUS_CODES
+
+logger = logging.getLogger(settings.PROJECT)
+
+telegram_session = None
 
 
 class TelegramClient:
@@ -10,18 +27,124 @@ class TelegramClient:
 
     def __init__(self, chat_id: int):
         self.chat_id = chat_id
+        self.session = get_telegram_session()
 
-    def send_message(
-            self,
+    @staticmethod
+    def format_message(
             message: str = None,
             template: str = "{message}",
             **kwargs
-    ):
+    ) -> str:
         message_data = {"message": message} if message is not None else {}
         message_data.update(**kwargs)
-        requests.get(
-            self.SEND_MESSAGE_URL, params={  # type: ignore
-                "chat_id": self.chat_id,
-                "text": template.format(**message_data),
-            }
+        return template.format(**message_data)
+
+    def send_message(self, *args, **kwargs) -> requests.Response:
+        return self.send_text(self.format_message(*args, **kwargs))
+
+    def send_text(self, text: str) -> requests.Response:
+        return self.post(self.SEND_MESSAGE_URL, {
+            "chat_id": self.chat_id,
+            "text": text,
+        })
+
+    def build_message(self, *args, **kwargs) -> OutgoingMessage:
+        return OutgoingMessage(
+            chat_id=self.chat_id, text=self.format_message(*args, **kwargs)
         )
+
+    def build_messages(self, *args, **kwargs) -> List[OutgoingMessage]:
+        text = self.format_message(*args, **kwargs)
+        return [
+            OutgoingMessage(chat_id=self.chat_id, text=chunk)
+            for chunk in split_text(text, settings.TELEGRAM_MESSAGE_MAX_LENGTH)
+        ]
+
+    def queue_message(self, *args, **kwargs) -> List[OutgoingMessage]:
+        # Saved one by one, so the parts are dispatched in order.
+        messages = self.build_messages(*args, **kwargs)
+        for message in messages:
+            message.save()
+        return messages
+
+    def post(self, url: str, data: dict) -> requests.Response:
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(
+                    url,
+                    json=data,
+                    timeout=(
+                        settings.TELEGRAM_CONNECT_TIMEOUT,
+                        settings.TELEGRAM_READ_TIMEOUT,
+                    ),
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt >= settings.TELEGRAM_MAX_RETRIES:
+                    raise
+                response, delay = None, get_retry_delay(attempt)
+                logger.warning(f"Telegram request failed: {exc}")
+            else:
+                retry = response.status_code in RETRY_STATUS_CODES
+                if not retry or attempt >= settings.TELEGRAM_MAX_RETRIES:
+                    break
+                delay = get_retry_delay(attempt, response)
+                logger.warning(
+                    f"Telegram responded {response.status_code}, "
+                    f"retry in {delay} sec"
+                )
+            attempt += 1
+            sleep(delay)
+
+        if not response.ok:
+            logger.error(
+                f"Telegram request failed with status "
+                f"{response.status_code}: {response.text}"
+            )
+        return response
+
+
+def get_retry_delay(
+        attempt: int, response: Optional[requests.Response] = None
+) -> float:
+    retry_after = None
+    if response is not None:
+        try:
+            retry_after = response.json().get("parameters", {}).get(
+                "retry_after"
+            )
+        except ValueError:
+            retry_after = None
+        retry_after = retry_after or response.headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    return settings.TELEGRAM_RETRY_BACKOFF * 2 ** attempt
+
+
+def split_text(text: str, max_length: int) -> List[str]:
+    # Telegram rejects longer texts, parts are cut at paragraph or line
+    # breaks where possible.
+    chunks = []
+    while len(text) > max_length:
+        cut = text.rfind("\n\n", 0, max_length + 1)
+        if cut <= 0:
+            cut = text.rfind("\n", 0, max_length + 1)
+        if cut <= 0:
+            cut = max_length
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    chunks.append(text)
+    return chunks
+
+
+def get_telegram_session() -> requests.Session:
+    return telegram_session or set_telegram_session()
+
+
+def set_telegram_session():
+    global telegram_session
+    telegram_session = requests.Session()
+    telegram_session.mount("https://", HTTPAdapter(
+        pool_connections=1, pool_maxsize=settings.TELEGRAM_POOL_SIZE
+    ))
+    return telegram_session
@@ -1 +1,10 @@
 ERROR_LENGTH = 250
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+OUTGOING_MESSAGE_NOTIFY_CHANNEL = "finder_outgoing_message"
+# First key of the advisory locks taken on chats while claiming messages.
+OUTGOING_MESSAGE_CHAT_LOCK_NAMESPACE = 2
+
+TELEGRAM_RATE_LIMITER_NAME = "TELEGRAM"
+TELEGRAM_CHAT_RATE_LIMITER_NAME = "TELEGRAM_CHAT_{chat_id}"
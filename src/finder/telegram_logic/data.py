@@ -1,25 +1,33 @@
 # Standard Library
+import re
 from dataclasses import (
     InitVar,
     dataclass,
     field,
 )
+from typing import List
 
 # Third Party Library
 from rest_framework.exceptions import ValidationError
 
+ORDER_IDS_SEPARATOR = re.compile(r"[\s,;]+")
+
 
 @dataclass
 class Message:
     message: InitVar[dict]
 
     chat_id: int = field(init=False)
-    order_id: int = field(init=False)
+    order_ids: List[str] = field(init=False)
 
     def __post_init__(self, message: dict):
         try:
             raw_message = message.get("message", {})
             self.chat_id = raw_message.get("chat", {}).get("id")
-            self.order_id = raw_message.get("text")
+            text = raw_message.get("text")
         except AttributeError:
             raise ValidationError("Wrong message data")
+        self.order_ids = [
+            order_id for order_id in ORDER_IDS_SEPARATOR.split(text.strip())
+            if order_id
+        ] if isinstance(text, str) else [text]
@@ -0,0 +1,188 @@
+# Standard Library
+import logging
+from datetime import timedelta
+from functools import lru_cache
+from time import sleep
+from typing import (
+    List,
+    Optional,
+    Set,
+)
+
+# Third Party Library
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Min,
+    Q,
+)
+from django.utils.timezone import now
+
+# Application Library
+from finder.event_logic.event_manager import lock_chats
+from finder.event_logic.listener import EventListener
+from finder.models import OutgoingMessage
+from finder.telegram_logic.client import (
+    TelegramClient,
+    get_retry_delay,
+)
+from finder.telegram_logic.constants import (
+    OUTGOING_MESSAGE_CHAT_LOCK_NAMESPACE,
+    OUTGOING_MESSAGE_NOTIFY_CHANNEL,
+    RETRY_STATUS_CODES,
+    TELEGRAM_CHAT_RATE_LIMITER_NAME,
+    TELEGRAM_RATE_LIMITER_NAME,
+)
+from rate_limiter import (
+    TokenBucket,
+    get_rate_limiter,
+)
+
+logger = logging.getLogger(f"{settings.PROJECT}.worker")
+
+
+class MessageDispatcher:
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or settings.TELEGRAM_DISPATCH_BATCH_SIZE
+        self.listener = EventListener(OUTGOING_MESSAGE_NOTIFY_CHANNEL)
+        self.timeout = settings.EVENT_WORKER_MIN_TIMEOUT
+        self.rate_limiter = get_rate_limiter(
+            TELEGRAM_RATE_LIMITER_NAME,
+            settings.TELEGRAM_RATE_LIMIT,
+            settings.TELEGRAM_RATE_LIMIT_PERIOD,
+        )
+
+    @staticmethod
+    def claim_messages(batch_size: int) -> List[OutgoingMessage]:
+        stale_at = now() - timedelta(seconds=settings.EVENT_CLAIM_TIMEOUT)
+        pending = Q(status=OutgoingMessage.MessageStatus.WAITING) | Q(
+            status=OutgoingMessage.MessageStatus.SENDING,
+            updated_at__lt=stale_at,
+        )
+        due = Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now())
+        with transaction.atomic():
+            candidates = OutgoingMessage.objects.select_for_update(
+                skip_locked=True
+            ).filter(pending & due)[:batch_size]
+            # A chat is claimed as a whole by one dispatcher at a time, so
+            # the parts of a split answer are sent in order.
+            chat_ids = lock_chats(
+                {message.chat_id for message in candidates},
+                OUTGOING_MESSAGE_CHAT_LOCK_NAMESPACE,
+            )
+            blocked_chats = set(
+                OutgoingMessage.objects.filter(
+                    chat_id__in=chat_ids,
+                    status=OutgoingMessage.MessageStatus.SENDING,
+                    updated_at__gte=stale_at,
+                ).values_list("chat_id", flat=True)
+            )
+            messages = []
+            for message in OutgoingMessage.objects.filter(
+                    pending, chat_id__in=chat_ids
+            ).order_by("created_at", "pk"):
+                if message.chat_id in blocked_chats:
+                    continue
+                # Later parts wait for an earlier one that is retried.
+                if message.next_attempt_at and message.next_attempt_at > now():
+                    blocked_chats.add(message.chat_id)
+                    continue
+                messages.append(message)
+                if len(messages) >= batch_size:
+                    break
+            OutgoingMessage.objects.filter(
+                pk__in=[message.pk for message in messages]
+            ).update(
+                status=OutgoingMessage.MessageStatus.SENDING, updated_at=now()
+            )
+        for message in messages:
+            message.status = OutgoingMessage.MessageStatus.SENDING
+        return messages
+
+    @staticmethod
+    def get_next_attempt_delay() -> Optional[float]:
+        next_attempt_at = OutgoingMessage.objects.filter(
+            status=OutgoingMessage.MessageStatus.WAITING,
+            next_attempt_at__gt=now(),
+        ).aggregate(next_attempt_at=Min("next_attempt_at"))["next_attempt_at"]
+        if next_attempt_at is None:
+            return None
+        return max((next_attempt_at - now()).total_seconds(), 0)
+
+    @staticmethod
+    @lru_cache(maxsize=settings.TELEGRAM_CHAT_RATE_LIMITERS_CACHE_SIZE)
+    def get_chat_rate_limiter(chat_id: int) -> TokenBucket:
+        # Bucket state lives in Redis, only recently active chats keep a
+        # local instance.
+        return TokenBucket(
+            TELEGRAM_CHAT_RATE_LIMITER_NAME.format(chat_id=chat_id),
+            settings.TELEGRAM_CHAT_RATE_LIMIT,
+            settings.TELEGRAM_CHAT_RATE_LIMIT_PERIOD,
+        )
+
+    def send(self, message: OutgoingMessage):
+        self.rate_limiter.acquire()
+        try:
+            response = TelegramClient(message.chat_id).send_text(message.text)
+        except Exception as exc:
+            message.set_error(
+                exc,
+                settings.TELEGRAM_DISPATCH_MAX_ATTEMPTS,
+                get_retry_delay(message.attempts),
+            )
+            return
+
+        if response.ok:
+            message.set_sent()
+        elif response.status_code in RETRY_STATUS_CODES:
+            message.set_error(
+                response.text,
+                settings.TELEGRAM_DISPATCH_MAX_ATTEMPTS,
+                get_retry_delay(message.attempts, response),
+            )
+        else:
+            message.set_error(response.text, max_attempts=0)
+
+    def dispatch_batch(self) -> List[OutgoingMessage]:
+        messages = self.claim_messages(self.batch_size)
+        deferred_chats: Set[int] = set()
+        for message in messages:
+            chat_id = message.chat_id
+            if chat_id not in deferred_chats:
+                wait = self.get_chat_rate_limiter(chat_id).try_acquire()
+                if wait:
+                    deferred_chats.add(chat_id)
+            if chat_id in deferred_chats:
+                message.set_waiting()
+                continue
+            self.send(message)
+            logger.info(f"Message {message.pk}: {message.status}")
+            # The rest of the answer waits for the part to be retried.
+            if message.status == OutgoingMessage.MessageStatus.WAITING:
+                deferred_chats.add(chat_id)
+        return messages
+
+    def wait(self) -> bool:
+        timeout = self.timeout
+        next_attempt_delay = self.get_next_attempt_delay()
+        if next_attempt_delay is not None:
+            timeout = min(timeout, next_attempt_delay)
+        return self.listener.wait(timeout)
+
+    def run(self):
+        while True:
+            messages = self.dispatch_batch()
+            sent = [
+                message for message in messages
+                if message.status != OutgoingMessage.MessageStatus.WAITING
+            ]
+            if sent:
+                self.timeout = settings.EVENT_WORKER_MIN_TIMEOUT
+            elif messages:
+                sleep(settings.TELEGRAM_CHAT_RATE_LIMIT_PERIOD)
+            elif self.wait():
+                self.timeout = settings.EVENT_WORKER_MIN_TIMEOUT
+            else:
+                self.timeout = min(
+                    self.timeout * 2, settings.EVENT_WORKER_MAX_TIMEOUT
+                )
@@ -0,0 +1,1191 @@
+# Standard Library
+from datetime import timedelta
+from random import Random
+from threading import (
+    Barrier,
+    Lock,
+    Thread,
+)
+from time import (
+    sleep,
+    time,
+)
+from typing import List
+from unittest import skipUnless
+from unittest.mock import (
+    Mock,
+    patch,
+)
+
+# Third Party Library
+from authlib.integrations.requests_client import AssertionSession
+from django.conf import settings
+from django.core.cache import (
+    cache,
+    caches,
+)
+from django.db import (
+    connection,
+    transaction,
+)
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+    skipUnlessDBFeature,
+)
+from django.utils.timezone import now
+from gspread_formatting import Color
+from rest_framework.exceptions import ValidationError
+
+# Application Library
+from cache_serializers import (
+    CompactSerializer,
+    RawSerializer,
+    SerializationError,
+)
+from circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from constants import (
+    EventManagerStatus,
+    PaperFormat,
+)
+from finder.event_logic.event_manager import (
+    EventManager,
+    get_retry_delay,
+    lock_chats,
+)
+from finder.event_logic.heartbeat import set_event_heartbeat
+from finder.event_logic.listener import EventListener
+from finder.event_logic.supervisor import WorkerSupervisor
+from finder.event_logic.worker import (
+    EventWorker,
+    get_memory_usage,
+)
+from finder.google_table_logic.client import (
+    Creds,
+    SharedAssertionSession,
+)
+from finder.google_table_logic.constants import GOOGLE_TOKEN_CACHE_KEY
+from finder.google_table_logic.data_manager import GoogleTableDataManager
+from finder.google_table_logic.order_index import OrderIndex
+from finder.google_table_logic.rules import DecisionTable
+from finder.google_table_logic.snapshot import (
+    SheetCell,
+    SheetSnapshot,
+)
+from finder.models import (
+    Event,
+    OutgoingMessage,
+)
+from finder.serializers import EventBatchSerializer
+from finder.telegram_logic.client import split_text
+from finder.telegram_logic.constants import (
+    OUTGOING_MESSAGE_CHAT_LOCK_NAMESPACE,
+)
+from finder.telegram_logic.data import Message
+from finder.telegram_logic.dispatcher import MessageDispatcher
+from helpers import (
+    CacheEntry,
+    CacheVersions,
+    LocalCache,
+    cache_versions,
+    cached_method,
+    get_cache_entry,
+    get_entry_cache,
+    local_cache,
+)
+from rate_limiter import TokenBucket
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "default",
+    },
+    "entries": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "entries",
+    },
+}
+
+COLORS = [
+    None,
+    Color(0.8509804, 0.91764706, 0.827451, 1),
+    Color(1, 0.9490196, 0.8, 1),
+    Color(0.95686275, 0.8, 0.8, 1),
+    Color(1, 1, 1, 1),
+]
+
+# Answer rules as they were written before the decision table.
+CASES = [
+    (lambda cell, row, ts: cell == ts[PaperFormat.A5], 8),
+    (
+        lambda cell, row, ts: cell == ts[
+            PaperFormat.A3
+        ] and row == ts[PaperFormat.A4],
+        6,
+    ),
+    (lambda cell, row, ts: cell == ts[PaperFormat.A4], 7),
+    (
+        lambda cell, row, ts: cell == ts[
+            PaperFormat.A3
+        ] and row == ts[PaperFormat.A3],
+        5,
+    ),
+]
+
+
+def wait_until(condition, timeout: float = 5) -> bool:
+    deadline = time() + timeout
+    while time() < deadline:
+        if condition():
+            return True
+        sleep(0.01)
+    return False
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    CACHE_ENABLED=True,
+    CACHE_LOCK_POLL_INTERVAL=0.01,
+)
+class CachedMethodTests(SimpleTestCase):
+    def setUp(self):
+        for alias in LOCMEM_CACHES:
+            caches[alias].clear()
+        local_cache.clear()
+        cache_versions._versions.clear()
+        self.calls = []
+
+    def get_function(self, delay: float = 0, **kwargs):
+        @cached_method(lambda value: f"TEST_{value}", 60, 5, beta=0, **kwargs)
+        def function(value):
+            self.calls.append(value)
+            sleep(delay)
+            return [value, len(self.calls)]
+        return function
+
+    def test_single_flight(self):
+        function = self.get_function(delay=0.2)
+        results = []
+        threads = [
+            Thread(target=lambda: results.append(function("a")))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, ["a"])
+        self.assertEqual(results, [["a", 1]] * 5)
+        self.assertIsNone(cache.get("LOCK_TEST_a"))
+
+    def test_waiter_keeps_foreign_lock(self):
+        function = cached_method(lambda value: f"TEST_{value}", 60, 0.1)(
+            lambda value: [value]
+        )
+        cache.set("LOCK_TEST_a", "other", 60)
+
+        self.assertEqual(function("a"), ["a"])
+        self.assertEqual(cache.get("LOCK_TEST_a"), "other")
+
+    def test_stale_while_revalidate(self):
+        function = self.get_function(stale_timeout=60)
+        get_entry_cache().set(
+            "TEST_a",
+            CompactSerializer().dumps(CacheEntry(["a", 0], time() - 1, 0)),
+            60,
+        )
+
+        self.assertEqual(function("a"), ["a", 0])
+        self.assertTrue(wait_until(
+            lambda: get_cache_entry("TEST_a").data == ["a", 1]
+        ))
+        self.assertEqual(function("a"), ["a", 1])
+        self.assertEqual(self.calls, ["a"])
+
+    def test_broken_entry_is_recomputed(self):
+        function = self.get_function()
+        get_entry_cache().set("TEST_a", b"\x80pickled", 60)
+
+        self.assertIsNone(get_cache_entry("TEST_a"))
+        self.assertEqual(function("a"), ["a", 1])
+        self.assertEqual(get_cache_entry("TEST_a").data, ["a", 1])
+
+    def test_version_invalidation(self):
+        function = self.get_function(local=True, version_key="TEST_VERSION")
+
+        self.assertEqual(function("a"), ["a", 1])
+        self.assertEqual(function("a"), ["a", 1])
+        cache_versions.bump("TEST_VERSION")
+        self.assertEqual(function("a"), ["a", 2])
+
+    def test_version_from_other_process(self):
+        versions = CacheVersions(check_interval=0)
+
+        self.assertEqual(versions.get("TEST_VERSION"), 0)
+        cache.set("TEST_VERSION", 3, None)
+        self.assertEqual(versions.get("TEST_VERSION"), 3)
+        self.assertEqual(versions.get(None), 0)
+
+
+class LocalCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.local_cache = LocalCache(max_size=2)
+
+    def get_entry(self, data, ttl: float = 60) -> CacheEntry:
+        return CacheEntry(data, time() + ttl, 0)
+
+    def test_least_recently_used_is_evicted(self):
+        self.local_cache.set("a", self.get_entry("a"), 0)
+        self.local_cache.set("b", self.get_entry("b"), 0)
+        self.local_cache.get("a", 0)
+        self.local_cache.set("c", self.get_entry("c"), 0)
+
+        self.assertIsNone(self.local_cache.get("b", 0))
+        self.assertEqual(self.local_cache.get("a", 0).data, "a")
+        self.assertEqual(self.local_cache.get("c", 0).data, "c")
+
+    def test_other_version_is_dropped(self):
+        self.local_cache.set("a", self.get_entry("a"), 1)
+
+        self.assertIsNone(self.local_cache.get("a", 2))
+        self.assertIsNone(self.local_cache.get("a", 1))
+
+    def test_expired_entry_is_dropped(self):
+        self.local_cache.set("a", self.get_entry("a", ttl=-1), 0)
+
+        self.assertIsNone(self.local_cache.get("a", 0))
+
+
+class SerializerTests(SimpleTestCase):
+    def setUp(self):
+        self.serializer = CompactSerializer(
+            compress_threshold=1024, compress_level=6
+        )
+
+    def assertRoundTrip(self, value):
+        self.assertEqual(
+            self.serializer.loads(self.serializer.dumps(value)), value
+        )
+
+    def test_round_trip(self):
+        self.assertRoundTrip(None)
+        self.assertRoundTrip([1, 2.5, True, "Детали из Ст3"])
+        self.assertRoundTrip((1, ("a", None)))
+        self.assertRoundTrip({1: "a", "b": [2], (3, 4): None})
+        self.assertRoundTrip({
+            PaperFormat.A5: COLORS[1], PaperFormat.A4: None
+        })
+        self.assertRoundTrip(CacheEntry(["Детали"], time(), 0.5))
+
+    def test_compression(self):
+        small = self.serializer.dumps(["a"])
+        large = self.serializer.dumps(["Детали из Ст3"] * 100)
+
+        self.assertEqual(small[:1], b"j")
+        self.assertEqual(large[:1], b"z")
+        self.assertEqual(
+            self.serializer.loads(large), ["Детали из Ст3"] * 100
+        )
+
+    def test_errors(self):
+        with self.assertRaises(SerializationError):
+            self.serializer.dumps({"a": object()})
+        with self.assertRaises(SerializationError):
+            self.serializer.loads(b"\x80pickled")
+
+    def test_raw_serializer(self):
+        serializer = RawSerializer({})
+
+        self.assertEqual(serializer.loads(serializer.dumps(b"j[]")), b"j[]")
+        with self.assertRaises(SerializationError):
+            serializer.dumps({"a": 1})
+
+
+class DecisionTableTests(SimpleTestCase):
+    def classify_with_cases(self, cell_color, row_color, templates) -> int:
+        for case, answer_number in CASES:
+            if case(cell_color, row_color, templates):
+                return answer_number
+        return GoogleTableDataManager.DEFAULT_ANSWER_NUMBER
+
+    def test_matches_cases(self):
+        random = Random(0)
+        for _ in range(200):
+            templates = {
+                paper_format: random.choice(COLORS)
+                for paper_format in PaperFormat
+            }
+            table = DecisionTable(
+                GoogleTableDataManager.RULES,
+                templates,
+                GoogleTableDataManager.DEFAULT_ANSWER_NUMBER,
+            )
+            for cell_color in COLORS:
+                for row_color in COLORS:
+                    self.assertEqual(
+                        table.classify(cell_color, row_color),
+                        self.classify_with_cases(
+                            cell_color, row_color, templates
+                        ),
+                        (templates, cell_color, row_color),
+                    )
+
+    def test_color_noise(self):
+        templates = {
+            PaperFormat.A5: Color(0.8509804, 0.91764706, 0.827451),
+            PaperFormat.A4: COLORS[2],
+            PaperFormat.A3: COLORS[3],
+        }
+        table = DecisionTable(GoogleTableDataManager.RULES, templates, 4)
+
+        self.assertEqual(
+            table.classify(Color(0.85098043, 0.9176471, 0.827451, 1), None),
+            8,
+        )
+        self.assertEqual(table.classify(COLORS[3], COLORS[2]), 6)
+        self.assertEqual(table.classify(COLORS[3], COLORS[3]), 5)
+        self.assertEqual(table.classify(COLORS[4], None), 4)
+
+
+class MessageTests(SimpleTestCase):
+    def get_message(self, text) -> Message:
+        return Message({"message": {"chat": {"id": 1}, "text": text}})
+
+    def test_order_ids(self):
+        message = self.get_message(" 1000000 1000001,9999999;\n1000002 ")
+
+        self.assertEqual(message.chat_id, 1)
+        self.assertEqual(
+            message.order_ids, ["1000000", "1000001", "9999999", "1000002"]
+        )
+
+    def test_not_text(self):
+        self.assertEqual(self.get_message(None).order_ids, [None])
+
+    def test_wrong_data(self):
+        with self.assertRaises(ValidationError):
+            Message({"message": "text"})
+
+    def test_serializer(self):
+        serializer = EventBatchSerializer(data={
+            "chat_id": 1, "order_ids": ["1000000", "1000001", "1000000"]
+        })
+
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(
+            serializer.validated_data["order_ids"], [1000000, 1000001]
+        )
+        events = serializer.build_events(batch_id=None)
+        self.assertEqual([event.order_id for event in events], [
+            1000000, 1000001
+        ])
+
+    def test_serializer_errors(self):
+        for order_ids in [
+            [],
+            ["123"],
+            ["abc1234"],
+            [str(1000000 + i) for i in range(settings.MESSAGE_MAX_ORDERS + 1)],
+        ]:
+            serializer = EventBatchSerializer(data={
+                "chat_id": 1, "order_ids": order_ids
+            })
+            self.assertFalse(serializer.is_valid(), order_ids)
+            self.assertIn("order_ids", serializer.errors)
+
+    def test_split_text(self):
+        text = "\n\n".join(["a" * 30] * 5)
+        chunks = split_text(text, 70)
+
+        self.assertEqual(chunks, ["\n\n".join(["a" * 30] * 2)] * 2 + [
+            "a" * 30
+        ])
+        self.assertEqual(split_text("a" * 25, 10), [
+            "a" * 10, "a" * 10, "a" * 5
+        ])
+
+
+class OrderIndexTests(SimpleTestCase):
+    def get_snapshot(self, *rows) -> SheetSnapshot:
+        return SheetSnapshot("Orders", [
+            [SheetCell(value) for value in row] for row in rows
+        ])
+
+    def test_exact_match(self):
+        order_index = OrderIndex()
+        order_index.refresh(self.get_snapshot(
+            ["91234567", "1234567-1", None],
+            ["12345678", "x1234567", "1234567 1234568"],
+        ))
+
+        self.assertEqual(order_index.lookup(1234567), [
+            (1, 2), (2, 2), (2, 3)
+        ])
+        self.assertEqual(order_index.lookup(1234568), [(2, 3)])
+        self.assertEqual(order_index.lookup(9123456), [])
+        self.assertEqual(order_index.lookup(2345678), [])
+        self.assertCountEqual(order_index.order_ids(), [1234567, 1234568])
+
+    def test_changed_rows_are_reindexed(self):
+        order_index = OrderIndex()
+        order_index.refresh(self.get_snapshot(
+            ["1000001"], ["1000002"], ["1000003"]
+        ), generation=1)
+
+        with patch.object(
+                order_index, "_index_row", wraps=order_index._index_row
+        ) as index_row:
+            order_index.refresh(self.get_snapshot(
+                ["1000001"], ["1000004"]
+            ), generation=2)
+
+        self.assertEqual(
+            [call.args[0] for call in index_row.call_args_list], [2]
+        )
+        self.assertEqual(order_index.lookup(1000001), [(1, 1)])
+        self.assertEqual(order_index.lookup(1000002), [])
+        self.assertEqual(order_index.lookup(1000003), [])
+        self.assertEqual(order_index.lookup(1000004), [(2, 1)])
+        self.assertEqual(order_index.generation, 2)
+
+    def test_same_snapshot_is_skipped(self):
+        order_index = OrderIndex()
+        snapshot = self.get_snapshot(["1000001"])
+        order_index.refresh(snapshot, generation=1)
+
+        with patch.object(
+                order_index, "_index_row", wraps=order_index._index_row
+        ) as index_row:
+            snapshot.rows[0][0] = SheetCell("1000002")
+            order_index.refresh(snapshot, generation=1)
+            order_index.refresh(self.get_snapshot(["1000001"]), 2)
+
+        index_row.assert_not_called()
+        self.assertEqual(order_index.lookup(1000001), [(1, 1)])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        for patcher in [
+            patch("rate_limiter.time", lambda: self.now),
+            patch("rate_limiter.sleep", self.sleep),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Without Redis behind the cache the bucket counts tokens locally.
+        self.bucket = TokenBucket("TEST", capacity=2, period=1)
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    def test_refill(self):
+        self.assertEqual(self.bucket.try_acquire(), 0)
+        self.assertEqual(self.bucket.try_acquire(), 0)
+        self.assertAlmostEqual(self.bucket.try_acquire(), 0.5)
+        self.now += 0.25
+        self.assertAlmostEqual(self.bucket.try_acquire(), 0.25)
+        self.now += 0.25
+        self.assertEqual(self.bucket.try_acquire(), 0)
+        self.now += 10
+        self.assertEqual(self.bucket.remaining(), 2)
+
+    def test_acquire_waits_for_tokens(self):
+        self.assertEqual(self.bucket.acquire(2), 0)
+        self.assertAlmostEqual(self.bucket.acquire(), 0.5)
+        self.assertAlmostEqual(self.now, 1000.5)
+
+    def test_local_fallback(self):
+        with patch.object(
+                self.bucket,
+                "_take_shared",
+                side_effect=ConnectionError("Redis is down"),
+        ), self.assertLogs(settings.PROJECT, "INFO") as logs:
+            self.assertEqual(self.bucket.try_acquire(), 0)
+            self.assertEqual(self.bucket.try_acquire(), 0)
+            self.assertAlmostEqual(self.bucket.try_acquire(), 0.5)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("falls back to local bucket", logs.output[0])
+
+        with patch.object(
+                self.bucket, "_take_shared", return_value=(0.0, 1.0)
+        ), self.assertLogs(settings.PROJECT, "INFO") as logs:
+            self.assertEqual(self.bucket.try_acquire(), 0)
+            self.assertEqual(self.bucket.remaining(), 1)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("uses shared bucket again", logs.output[0])
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    CACHE_LOCK_POLL_INTERVAL=0.01,
+    GOOGLE_TOKEN_REFRESH_MARGIN=60,
+    GOOGLE_TOKEN_LOCK_TIMEOUT=5,
+)
+class SharedAssertionSessionTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.issued = []
+        patcher = patch.object(
+            AssertionSession,
+            "refresh_token",
+            autospec=True,
+            side_effect=self.issue_token,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def issue_token(self, session, expires_in: int = 3600) -> dict:
+        self.issued.append(session)
+        session.token = {
+            "access_token": f"token-{len(self.issued)}",
+            "token_type": "Bearer",
+            "expires_in": expires_in,
+        }
+        return session.token
+
+    def get_session(self) -> SharedAssertionSession:
+        creds = Creds({
+            "token_uri": "https://oauth2.example.com/token",
+            "client_email": "finder@example.com",
+            "private_key": "key",
+        })
+        return SharedAssertionSession(
+            token_endpoint=creds.token_endpoint,
+            issuer=creds.issuer,
+            subject=creds.subject,
+            audience=creds.audience,
+            claims=creds.claims,
+            key=creds.key,
+        )
+
+    def test_token_is_shared(self):
+        session, other_session = self.get_session(), self.get_session()
+
+        token = session.ensure_active_token()
+        self.assertEqual(token["access_token"], "token-1")
+        self.assertEqual(
+            other_session.ensure_active_token()["access_token"], "token-1"
+        )
+        self.assertEqual(self.issued, [session])
+        self.assertIsNone(cache.get(SharedAssertionSession.lock_key))
+
+    def test_token_is_renewed_ahead_of_expiry(self):
+        session, other_session = self.get_session(), self.get_session()
+        self.issue_token(session, expires_in=30)
+        cache.set(GOOGLE_TOKEN_CACHE_KEY, dict(session.token), 30)
+        refresh_lock = Lock()
+        refresh_lock.acquire()
+
+        def issue_token_later(session):
+            refresh_lock.acquire(timeout=5)
+            return self.issue_token(session)
+
+        AssertionSession.refresh_token.side_effect = issue_token_later
+        token = other_session.ensure_active_token()
+        self.assertEqual(token["access_token"], "token-1")
+        refresh_lock.release()
+        self.assertTrue(wait_until(lambda: len(self.issued) == 2))
+        self.assertTrue(wait_until(
+            lambda: not cache.get(SharedAssertionSession.lock_key)
+        ))
+        self.assertEqual(
+            session.ensure_active_token()["access_token"], "token-2"
+        )
+        self.assertEqual(len(self.issued), 2)
+
+    def test_expired_token_waits_for_lock_owner(self):
+        session, other_session = self.get_session(), self.get_session()
+        cache.set(SharedAssertionSession.lock_key, 1, 5)
+
+        def refresh_elsewhere():
+            sleep(0.1)
+            self.issue_token(other_session)
+            cache.set(GOOGLE_TOKEN_CACHE_KEY, dict(other_session.token), 60)
+            cache.delete(SharedAssertionSession.lock_key)
+
+        thread = Thread(target=refresh_elsewhere)
+        thread.start()
+        token = session.ensure_active_token()
+        thread.join()
+
+        self.assertEqual(token["access_token"], "token-1")
+        self.assertEqual(self.issued, [other_session])
+
+
+def create_events(*chat_ids) -> List[Event]:
+    return Event.objects.bulk_create([
+        Event(chat_id=chat_id, order_id=1000000 + index)
+        for index, chat_id in enumerate(chat_ids)
+    ])
+
+
+class ClaimEventsTests(TestCase):
+    def setUp(self):
+        self.heartbeat = set_event_heartbeat()
+
+    def test_claimed_events_are_in_progress(self):
+        events = create_events(1, 2)
+
+        self.assertEqual(EventManager.claim_events(10), events)
+        self.assertEqual(EventManager.claim_events(10), [])
+        self.assertEqual(
+            Event.objects.filter(
+                status=Event.EventStatus.IN_PROGRESS
+            ).count(),
+            2,
+        )
+
+    @override_settings(EVENT_CLAIM_TIMEOUT=60)
+    def test_only_events_without_heartbeat_are_reclaimed(self):
+        alive_event, dead_event = create_events(1, 2)
+        EventManager.claim_events(10)
+        # The worker holding the second event died.
+        self.heartbeat.discard([dead_event.pk])
+        Event.objects.update(updated_at=now() - timedelta(seconds=61))
+
+        self.assertEqual(self.heartbeat.beat(), 1)
+        self.assertEqual(EventManager.claim_events(10), [dead_event])
+        self.assertEqual(EventManager.claim_events(10), [])
+
+    @override_settings(EVENT_CLAIM_TIMEOUT=60, EVENT_MAX_ATTEMPTS=2)
+    def test_reclaim_counts_as_attempt(self):
+        event, = create_events(1)
+        EventManager.claim_events(10)
+        self.heartbeat.discard([event.pk])
+        Event.objects.update(updated_at=now() - timedelta(seconds=61))
+
+        reclaimed_event, = EventManager.claim_events(10)
+        self.assertEqual(reclaimed_event.attempts, 1)
+        self.heartbeat.discard([event.pk])
+        Event.objects.update(updated_at=now() - timedelta(seconds=61))
+
+        self.assertEqual(EventManager.claim_events(10), [])
+        event.refresh_from_db()
+        self.assertEqual(event.status, Event.EventStatus.FAILED)
+        self.assertEqual(event.attempts, 2)
+        self.assertTrue(OutgoingMessage.objects.filter(
+            chat_id=event.chat_id, text__contains="interrupted"
+        ).exists())
+
+
+class FairClaimTests(TestCase):
+    def setUp(self):
+        set_event_heartbeat()
+
+    def test_flood_does_not_starve_other_chat(self):
+        create_events(*[1] * 20)
+        quiet_event, = create_events(2)
+
+        self.assertIn(quiet_event, EventManager.claim_events(3))
+
+    @override_settings(EVENT_CHAT_CONCURRENCY=1)
+    def test_chat_concurrency(self):
+        flood_events = create_events(*[1] * 20)
+        quiet_event, = create_events(2)
+
+        self.assertEqual(
+            EventManager.claim_events(10), [flood_events[0], quiet_event]
+        )
+        self.assertEqual(EventManager.claim_events(10), [])
+
+    @override_settings(EVENT_CHAT_CONCURRENCY=1)
+    def test_chat_concurrency_covers_coalesced_events(self):
+        Event.objects.bulk_create([
+            Event(chat_id=1, order_id=1000000) for _ in range(5)
+        ])
+        quiet_event, = create_events(2)
+
+        events = EventManager.claim_events(10)
+        self.assertEqual(len(events), 2)
+        self.assertEqual(
+            [event.chat_id for event in events].count(1), 1
+        )
+        self.assertIn(quiet_event, events)
+
+
+@skipUnlessDBFeature("has_select_for_update_skip_locked")
+class ConcurrentClaimEventsTests(TransactionTestCase):
+    def test_claimers_never_share_events(self):
+        events = create_events(*[index % 7 for index in range(200)])
+        claimers = 4
+        barrier = Barrier(claimers)
+        claimed: List[List[int]] = [[] for _ in range(claimers)]
+
+        def claim(event_ids: List[int]):
+            try:
+                barrier.wait()
+                while Event.objects.filter(
+                        status=Event.EventStatus.WAITING
+                ).exists():
+                    event_ids += [
+                        event.pk for event in EventManager.claim_events(5)
+                    ]
+            finally:
+                connection.close()
+
+        threads = [
+            Thread(target=claim, args=(event_ids,)) for event_ids in claimed
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        claimed_ids = [pk for event_ids in claimed for pk in event_ids]
+        self.assertEqual(len(claimed_ids), len(set(claimed_ids)))
+        self.assertCountEqual(claimed_ids, [event.pk for event in events])
+        self.assertTrue(all(claimed))
+
+    @override_settings(EVENT_CHAT_CONCURRENCY=1)
+    def test_claimers_respect_chat_concurrency(self):
+        create_events(*[1] * 50)
+        claimed: List[List[Event]] = [[], []]
+        in_claim: List[List[Event]] = []
+        count_reclaimed = EventManager.count_reclaimed
+
+        def count_reclaimed_slowly(events: List[Event]) -> List[Event]:
+            # Keeps the first claim open while the second one runs.
+            in_claim.append(events)
+            sleep(0.3)
+            return count_reclaimed(events)
+
+        def claim(events: List[Event], batch_size: int):
+            try:
+                events += EventManager.claim_events(batch_size)
+            finally:
+                connection.close()
+
+        # The second claimer asks for more events, so it gets a row the
+        # first one hasn't locked.
+        threads = [
+            Thread(target=claim, args=(events, batch_size))
+            for batch_size, events in enumerate(claimed, start=1)
+        ]
+        with patch.object(
+                EventManager,
+                "count_reclaimed",
+                side_effect=count_reclaimed_slowly,
+        ):
+            threads[0].start()
+            self.assertTrue(wait_until(lambda: in_claim))
+            threads[1].start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(claimed[0]), 1)
+        self.assertEqual(claimed[1], [])
+
+
+@override_settings(EVENT_RETRY_BACKOFF=5, EVENT_RETRY_MAX_DELAY=60)
+class RetryTests(TestCase):
+    def test_retry_delay(self):
+        with patch("finder.event_logic.event_manager.random", lambda: 1):
+            self.assertEqual(get_retry_delay(0), 5)
+            self.assertEqual(get_retry_delay(3), 40)
+            self.assertEqual(get_retry_delay(10), 60)
+        with patch("finder.event_logic.event_manager.random", lambda: 0):
+            self.assertEqual(get_retry_delay(3), 20)
+
+    def test_transient_error_is_retried_later(self):
+        set_event_heartbeat()
+        create_events(1, 1)
+        event_manager = EventManager(EventManager.claim_events(10))
+
+        event_manager._operate_error(CircuitOpenError("Circuit is open"))
+
+        self.assertEqual(event_manager.status, EventManagerStatus.RETRY)
+        for event in Event.objects.all():
+            self.assertEqual(event.status, Event.EventStatus.WAITING)
+            self.assertEqual(event.attempts, 1)
+            self.assertGreater(event.next_attempt_at, now())
+        self.assertEqual(EventManager.claim_events(10), [])
+        Event.objects.update(next_attempt_at=now())
+        self.assertEqual(len(EventManager.claim_events(10)), 2)
+
+    @override_settings(EVENT_MAX_ATTEMPTS=2)
+    def test_last_attempt_fails(self):
+        event, = create_events(1)
+        Event.objects.update(attempts=1)
+        event.refresh_from_db()
+        event_manager = EventManager([event])
+
+        event_manager._operate_error(CircuitOpenError("Circuit is open"))
+
+        event.refresh_from_db()
+        self.assertEqual(event_manager.status, EventManagerStatus.ERROR)
+        self.assertEqual(event.status, Event.EventStatus.FAILED)
+
+    def test_other_error_is_not_retried(self):
+        event, = create_events(1)
+        event_manager = EventManager([event])
+
+        event_manager._operate_error(ValueError("Broken sheet"))
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, Event.EventStatus.FAILED)
+        self.assertEqual(event.attempts, 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.circuit_breaker = CircuitBreaker(
+            "TEST", error_rate=0.5, min_requests=4, window=3600,
+            open_timeout=0.05,
+        )
+
+    def trip(self):
+        for _ in range(4):
+            self.circuit_breaker.record_failure()
+
+    def test_trips_on_error_rate(self):
+        for _ in range(3):
+            self.circuit_breaker.record_success()
+        self.circuit_breaker.record_failure()
+        self.circuit_breaker.record_failure()
+        self.assertFalse(self.circuit_breaker.is_open)
+
+        self.circuit_breaker.record_failure()
+        self.assertTrue(self.circuit_breaker.is_open)
+        with self.assertRaises(CircuitOpenError):
+            self.circuit_breaker.before_call()
+
+    def test_not_enough_requests(self):
+        for _ in range(3):
+            self.circuit_breaker.record_failure()
+
+        self.assertFalse(self.circuit_breaker.is_open)
+        self.circuit_breaker.before_call()
+
+    def test_half_open_probe_closes(self):
+        self.trip()
+        sleep(0.1)
+
+        self.assertFalse(self.circuit_breaker.is_open)
+        self.circuit_breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.circuit_breaker.before_call()
+        self.circuit_breaker.record_success()
+        self.circuit_breaker.before_call()
+        self.circuit_breaker.before_call()
+
+    def test_failed_probe_trips_again(self):
+        self.trip()
+        sleep(0.1)
+
+        self.circuit_breaker.before_call()
+        self.circuit_breaker.record_failure()
+        self.assertTrue(self.circuit_breaker.is_open)
+        with self.assertRaises(CircuitOpenError):
+            self.circuit_breaker.before_call()
+
+
+@skipUnless(connection.vendor == "postgresql", "Needs LISTEN/NOTIFY")
+class EventNotifyTests(TransactionTestCase):
+    def test_waiting_events_notify(self):
+        listener = EventListener()
+        listener.listen()
+
+        event, = create_events(1)
+        self.assertTrue(listener.wait(1))
+        Event.objects.update(status=Event.EventStatus.IN_PROGRESS)
+        self.assertFalse(listener.wait(0.1))
+        event.refresh_from_db()
+        event.set_retry(ValueError("Quota exceeded"), 60)
+        self.assertTrue(listener.wait(1))
+        event.set_retry(ValueError("Quota exceeded"), 60)
+        self.assertFalse(listener.wait(0.1))
+
+
+class EventWorkerTests(TestCase):
+    def setUp(self):
+        self.worker = EventWorker()
+        self.worker.timeout = 30
+
+    def test_wait_ends_at_next_attempt(self):
+        create_events(1, 2)
+        Event.objects.filter(chat_id=1).update(
+            next_attempt_at=now() + timedelta(seconds=2)
+        )
+        Event.objects.filter(chat_id=2).update(
+            next_attempt_at=now() - timedelta(seconds=2)
+        )
+
+        with patch.object(
+                self.worker.listener, "wait", return_value=False
+        ) as wait:
+            self.worker.wait()
+
+        timeout, = wait.call_args.args
+        self.assertGreater(timeout, 1)
+        self.assertLessEqual(timeout, 2)
+
+    def test_wait_without_retries(self):
+        create_events(1)
+
+        with patch.object(
+                self.worker.listener, "wait", return_value=True
+        ) as wait:
+            self.worker.wait()
+
+        wait.assert_called_once_with(30)
+        self.assertEqual(
+            self.worker.timeout, settings.EVENT_WORKER_MIN_TIMEOUT
+        )
+
+    def test_recycle_after_max_events(self):
+        worker = EventWorker(max_events=3)
+        worker.processed = 2
+        self.assertFalse(worker.should_stop)
+
+        worker.processed = 3
+        self.assertTrue(worker.should_stop)
+
+    def test_recycle_at_max_memory(self):
+        worker = EventWorker(max_memory=512)
+        path = "finder.event_logic.worker.get_memory_usage"
+        with patch(path, return_value=511):
+            self.assertFalse(worker.should_stop)
+        with patch(path, return_value=512):
+            self.assertTrue(worker.should_stop)
+
+    def test_memory_usage_follows_current_usage(self):
+        usage = get_memory_usage()
+        buffer = b"x" * 64 * 1024 * 1024
+        self.assertGreaterEqual(get_memory_usage(), usage + 60)
+        del buffer
+        self.assertLess(get_memory_usage(), usage + 60)
+
+
+@override_settings(
+    EVENT_SUPERVISOR_EVENTS_PER_WORKER=10,
+    EVENT_SUPERVISOR_MAX_EVENT_AGE=30,
+    EVENT_SUPERVISOR_SCALE_DOWN_DELAY=60,
+)
+class WorkerSupervisorTests(TestCase):
+    def setUp(self):
+        self.supervisor = WorkerSupervisor(1, 4)
+        self.supervisor.start_worker = Mock(
+            side_effect=lambda: self.supervisor.workers.append(
+                self.create_process()
+            )
+        )
+        self.supervisor.stop_worker = Mock(
+            side_effect=lambda: self.supervisor.stopping.append(
+                self.supervisor.workers.pop()
+            )
+        )
+
+    @staticmethod
+    def create_process(exitcode=None) -> Mock:
+        return Mock(
+            pid=1,
+            exitcode=exitcode,
+            is_alive=Mock(return_value=exitcode is None),
+        )
+
+    def test_target_follows_queue_depth(self):
+        self.assertEqual(self.supervisor.get_target(), 1)
+
+        create_events(*range(25))
+        self.assertEqual(self.supervisor.get_target(), 3)
+
+        create_events(*range(100))
+        self.assertEqual(self.supervisor.get_target(), 4)
+
+    def test_target_grows_for_old_events(self):
+        create_events(1)
+        Event.objects.update(created_at=now() - timedelta(seconds=60))
+        self.supervisor.workers = [self.create_process()] * 2
+
+        self.assertEqual(self.supervisor.get_target(), 3)
+
+    def test_target_skips_delayed_retries(self):
+        create_events(*range(25))
+        Event.objects.update(next_attempt_at=now() + timedelta(seconds=60))
+
+        self.assertEqual(self.supervisor.get_target(), 1)
+
+    def test_scale_up_is_immediate(self):
+        create_events(*range(25))
+
+        self.supervisor.scale()
+
+        self.assertEqual(len(self.supervisor.workers), 3)
+
+    def test_scale_down_waits(self):
+        self.supervisor.workers = [self.create_process() for _ in range(3)]
+
+        self.supervisor.scale()
+        self.assertEqual(len(self.supervisor.workers), 3)
+
+        self.supervisor.scaled_at -= settings.EVENT_SUPERVISOR_SCALE_DOWN_DELAY
+        self.supervisor.scale()
+        self.assertEqual(len(self.supervisor.workers), 2)
+        self.supervisor.scale()
+        self.assertEqual(len(self.supervisor.workers), 2)
+
+    def test_reap_replaces_exited_workers(self):
+        running = self.create_process()
+        recycled = self.create_process(exitcode=0)
+        crashed = self.create_process(exitcode=1)
+        stopped = self.create_process(exitcode=0)
+        self.supervisor.workers = [running, recycled, crashed]
+        self.supervisor.stopping = [stopped]
+        self.supervisor.min_workers = 3
+
+        self.supervisor.reap()
+
+        self.assertEqual(self.supervisor.workers, [running])
+        self.assertEqual(self.supervisor.stopping, [])
+        for process in (recycled, crashed, stopped):
+            process.join.assert_called_once_with()
+
+        self.supervisor.scale()
+        self.assertEqual(len(self.supervisor.workers), 3)
+
+
+def create_messages(*chat_ids) -> List[OutgoingMessage]:
+    return [
+        OutgoingMessage.objects.create(chat_id=chat_id, text=f"Part {index}")
+        for index, chat_id in enumerate(chat_ids)
+    ]
+
+
+class MessageDispatcherTests(TestCase):
+    def setUp(self):
+        self.dispatcher = MessageDispatcher()
+        self.dispatcher.rate_limiter = Mock()
+        self.chat_rate_limiter = Mock()
+        self.chat_rate_limiter.try_acquire.return_value = 0
+        patcher = patch.object(
+            MessageDispatcher,
+            "get_chat_rate_limiter",
+            return_value=self.chat_rate_limiter,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_claimed_in_order(self):
+        messages = create_messages(1, 2, 1, 1)
+
+        claimed = self.dispatcher.claim_messages(10)
+
+        self.assertEqual(claimed, messages)
+        self.assertFalse(
+            OutgoingMessage.objects.exclude(
+                status=OutgoingMessage.MessageStatus.SENDING
+            ).exists()
+        )
+
+    def test_chat_being_sent_is_skipped(self):
+        first, second, other = create_messages(1, 1, 2)
+        first.status = OutgoingMessage.MessageStatus.SENDING
+        first.save()
+
+        self.assertEqual(self.dispatcher.claim_messages(10), [other])
+
+    def test_stale_message_is_reclaimed(self):
+        first, second = create_messages(1, 1)
+        OutgoingMessage.objects.filter(pk=first.pk).update(
+            status=OutgoingMessage.MessageStatus.SENDING,
+            updated_at=now() - timedelta(
+                seconds=settings.EVENT_CLAIM_TIMEOUT + 1
+            ),
+        )
+
+        self.assertEqual(self.dispatcher.claim_messages(10), [first, second])
+
+    def test_parts_wait_for_retried_part(self):
+        first, second, other = create_messages(1, 1, 2)
+        first.next_attempt_at = now() + timedelta(seconds=60)
+        first.save()
+
+        self.assertEqual(self.dispatcher.claim_messages(10), [other])
+        self.assertGreater(MessageDispatcher.get_next_attempt_delay(), 59)
+
+        OutgoingMessage.objects.filter(pk=first.pk).update(
+            next_attempt_at=now() - timedelta(seconds=1)
+        )
+        self.assertEqual(self.dispatcher.claim_messages(10), [first, second])
+
+    def test_retryable_error_is_retried_later(self):
+        first, second, other = create_messages(1, 1, 2)
+        busy = Mock(ok=False, status_code=429, text="Too Many Requests")
+        busy.json.return_value = {"parameters": {"retry_after": 30}}
+        sent = Mock(ok=True)
+
+        with patch(
+                "finder.telegram_logic.dispatcher.TelegramClient.send_text",
+                side_effect=[busy, sent],
+        ) as send_text:
+            self.dispatcher.dispatch_batch()
+
+        self.assertEqual(send_text.call_count, 2)
+        first.refresh_from_db()
+        self.assertEqual(first.status, OutgoingMessage.MessageStatus.WAITING)
+        self.assertEqual(first.attempts, 1)
+        self.assertGreater(
+            first.next_attempt_at, now() + timedelta(seconds=29)
+        )
+        second.refresh_from_db()
+        self.assertEqual(second.status, OutgoingMessage.MessageStatus.WAITING)
+        self.assertEqual(second.attempts, 0)
+        other.refresh_from_db()
+        self.assertEqual(other.status, OutgoingMessage.MessageStatus.SENT)
+
+    def test_rate_limited_chat_is_deferred(self):
+        first, second, other = create_messages(1, 1, 2)
+        self.chat_rate_limiter.try_acquire.side_effect = [0.5, 0]
+
+        with patch(
+                "finder.telegram_logic.dispatcher.TelegramClient.send_text",
+                return_value=Mock(ok=True),
+        ) as send_text:
+            messages = self.dispatcher.dispatch_batch()
+
+        send_text.assert_called_once_with(other.text)
+        self.assertEqual(
+            [message.status for message in messages],
+            [
+                OutgoingMessage.MessageStatus.WAITING,
+                OutgoingMessage.MessageStatus.WAITING,
+                OutgoingMessage.MessageStatus.SENT,
+            ],
+        )
+        self.assertEqual(self.chat_rate_limiter.try_acquire.call_count, 2)
+
+
+@skipUnless(connection.vendor == "postgresql", "Needs advisory locks")
+class ConcurrentMessageDispatcherTests(TransactionTestCase):
+    def test_locked_chat_is_skipped(self):
+        first, second, other = create_messages(1, 1, 2)
+        claimed: List[OutgoingMessage] = []
+
+        def claim():
+            try:
+                claimed.extend(MessageDispatcher.claim_messages(10))
+            finally:
+                connection.close()
+
+        # Another dispatcher is in the middle of claiming the first part.
+        with transaction.atomic():
+            OutgoingMessage.objects.select_for_update().get(pk=first.pk)
+            lock_chats({1}, OUTGOING_MESSAGE_CHAT_LOCK_NAMESPACE)
+            thread = Thread(target=claim)
+            thread.start()
+            thread.join(5)
+            blocked = thread.is_alive()
+        thread.join()
+
+        self.assertFalse(blocked)
+        self.assertEqual(claimed, [other])
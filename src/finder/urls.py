@@ -2,8 +2,12 @@
 from django.urls import path
 
 # Application Library
-from finder.views import EventCreateView
+from finder.views import (
+    EventCreateView,
+    event_ingest_view,
+)
 
 urlpatterns = [
     path("", EventCreateView.as_view(), name="create-event"),
+    path("ingest/", event_ingest_view, name="ingest-event"),
 ]
@@ -1,9 +1,15 @@
 # Standard Library
+import json
 from contextlib import suppress
 from dataclasses import asdict
 from typing import Any
+from uuid import uuid4
 
 # Third Party Library
+from django.http import (
+    HttpResponse,
+    JsonResponse,
+)
 from rest_framework import (
     serializers,
     status,
@@ -12,8 +18,11 @@ from rest_framework.generics import CreateAPIView
 from rest_framework.response import Response
 
 # Application Library
-from finder.serializers import EventSerializer
+from finder.event_logic.ingest import get_event_batcher
+from finder.serializers import EventBatchSerializer
 from finder.telegram_logic.callbacks import (
+    build_error_message,
+    build_success_message,
     event_error_callback,
     event_success_callback,
 )
@@ -42,7 +51,7 @@ class TelegramPostMixin:
 
 
 class EventCreateView(TelegramPostMixin, CreateCallbackMixin, CreateAPIView):
-    serializer_class = EventSerializer
+    serializer_class = EventBatchSerializer
     success_callback = staticmethod(event_success_callback)
     error_callback = staticmethod(event_error_callback)
 
@@ -55,3 +64,34 @@ class EventCreateView(TelegramPostMixin, CreateCallbackMixin, CreateAPIView):
         return Response(
             serializer.data, status=status.HTTP_201_CREATED, headers=headers
         )
+
+
+async def event_ingest_view(request):
+    if request.method != "POST":
+        return HttpResponse(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    batcher = get_event_batcher()
+    data: dict = {}
+    try:
+        data = json.loads(request.body)
+        message = Message(data)
+        serializer = EventBatchSerializer(data=asdict(message))
+        serializer.is_valid(raise_exception=True)
+    except (ValueError, serializers.ValidationError) as exc:
+        with suppress(KeyError, AttributeError, TypeError):
+            chat_id = data["message"]["chat"]["id"]
+            await batcher.add([], [build_error_message(chat_id, exc)])
+        return HttpResponse(status=status.HTTP_200_OK)
+
+    batch_id = uuid4()
+    await batcher.add(
+        serializer.build_events(batch_id),
+        [build_success_message(serializer.validated_data)],
+    )
+    return JsonResponse(
+        {**serializer.data, "batch_id": str(batch_id)},
+        status=status.HTTP_201_CREATED,
+    )
+
+
+event_ingest_view.csrf_exempt = True  # type: ignore
@@ -1,18 +1,48 @@
 # Standard Library
-import pickle
-from collections import Callable
+import logging
+from collections import (
+    Callable,
+    OrderedDict,
+)
+from dataclasses import dataclass
 from functools import wraps
 from logging import Logger
+from math import log
+from random import random
+from threading import (
+    Lock,
+    Thread,
+)
+from time import (
+    sleep,
+    time,
+)
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Tuple,
+)
 
 # Third Party Library
 from django.conf import settings
-from django.core.cache import cache
+from django.core.cache import (
+    cache,
+    caches,
+)
 from rest_framework import serializers
 
 # Application Library
+from cache_serializers import (
+    SerializationError,
+    get_cache_serializer,
+    register_type,
+)
 from constants import MessageLevel
 from finder.telegram_logic.client import TelegramClient
 
+logger = logging.getLogger(settings.PROJECT)
+
 
 class IntegerLengthValidator:
     def __init__(
@@ -44,30 +74,231 @@ def operate_message(
         level: MessageLevel,
 ):
     getattr(logger, level.value.lower())(message)
-    client.send_message(
+    client.queue_message(
         message=message,
         level=level.value,
         template=LOGGING_MESSAGE_TEMPLATE
     )
 
 
-def cached_method(key_function: Callable, timeout: int):
+LOCK_CACHE_KEY = "LOCK_{key}"
+VERSIONED_CACHE_KEY = "{key}_V{version}"
+
+
+@dataclass
+class CacheEntry:
+    data: Any
+    expires_at: float
+    delta: float
+
+    def is_fresh(self, beta: float) -> bool:
+        # Probabilistic early expiration (XFetch): the closer the entry is to
+        # its expiry and the longer it took to compute, the more likely a
+        # caller refreshes it ahead of time.
+        early_gap = -self.delta * beta * log(1 - random())
+        return time() + early_gap < self.expires_at
+
+
+class LocalCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, Tuple[CacheEntry, int]]" = (
+            OrderedDict()
+        )
+
+    def get(self, key: str, version: int) -> Optional[CacheEntry]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, entry_version = item
+            if entry_version != version or entry.expires_at <= time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry, version: int):
+        with self._lock:
+            self._entries[key] = (entry, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CacheVersions:
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._versions: Dict[str, Tuple[int, float]] = {}
+
+    def get(self, key: Optional[str]) -> int:
+        if key is None:
+            return 0
+        version, checked_at = self._versions.get(key, (0, 0.0))
+        if time() - checked_at >= self.check_interval:
+            version = cache.get(key) or 0
+            self._versions[key] = (version, time())
+        return version
+
+    def bump(self, key: str) -> int:
+        cache.add(key, 0, None)
+        version = cache.incr(key)
+        self._versions[key] = (version, time())
+        logger.info(f"Cache version '{key}' bumped to {version}")
+        return version
+
+
+register_type(
+    CacheEntry,
+    "e",
+    lambda entry: [entry.data, entry.expires_at, entry.delta],
+    lambda fields: CacheEntry(*fields),
+)
+
+local_cache = LocalCache(settings.LOCAL_CACHE_MAX_SIZE)
+cache_versions = CacheVersions(settings.CACHE_VERSION_CHECK_INTERVAL)
+
+
+def get_entry_cache():
+    # Entries are serialized here, their cache alias stores the bytes as is.
+    return caches[settings.CACHE_ENTRIES_ALIAS]
+
+
+def get_cache_entry(cache_key: str) -> Optional[CacheEntry]:
+    cached_data = get_entry_cache().get(cache_key)
+    if cached_data is None:
+        return None
+    try:
+        entry = get_cache_serializer().loads(cached_data)
+    except (SerializationError, ValueError, KeyError, TypeError) as exc:
+        logger.warning(f"Failed to load cache '{cache_key}': {exc}")
+        return None
+    return entry if isinstance(entry, CacheEntry) else None
+
+
+def wait_for_cache_entry(
+        cache_key: str, lock_key: str, timeout: int
+) -> Optional[CacheEntry]:
+    deadline = time() + timeout
+    while time() < deadline:
+        entry = get_cache_entry(cache_key)
+        if entry is not None or not cache.get(lock_key):
+            return entry
+        sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+    return None
+
+
+def cached_method(
+        key_function: Callable,
+        timeout: int,
+        lock_timeout: Optional[int] = None,
+        *,
+        stale_timeout: int = 0,
+        negative_timeout: Optional[int] = None,
+        beta: Optional[float] = None,
+        local: bool = False,
+        version_key: Optional[str] = None,
+):
     def decorator(func: Callable) -> Callable:
+        def refresh(
+                cache_key: str,
+                lock_key: Optional[str],
+                version: int,
+                *args,
+                **kwargs
+        ):
+            # lock_key is only passed by the caller holding the lock.
+            try:
+                started_at = time()
+                data = func(*args, **kwargs)
+                delta = time() - started_at
+                ttl = timeout if data else negative_ttl
+                if ttl:
+                    entry = CacheEntry(data, time() + ttl, delta)
+                    get_entry_cache().set(
+                        cache_key,
+                        get_cache_serializer().dumps(entry),
+                        ttl + stale_timeout,
+                    )
+                    if local:
+                        local_cache.set(cache_key, entry, version)
+                return data
+            finally:
+                if lock_key:
+                    cache.delete(lock_key)
+
+        def refresh_in_background(
+                cache_key: str, lock_key: str, version: int, *args, **kwargs
+        ):
+            try:
+                refresh(cache_key, lock_key, version, *args, **kwargs)
+            except Exception as exc:
+                logger.error(f"Failed to refresh cache '{cache_key}': {exc}")
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             if not settings.CACHE_ENABLED:
                 return func(*args, **kwargs)
 
+            # Keys are tied to the current version, so bumping it invalidates
+            # every entry in both tiers at once.
+            version = cache_versions.get(version_key)
             cache_key = key_function(*args, **kwargs)
-            cached_data = cache.get(cache_key)
+            if version_key:
+                cache_key = VERSIONED_CACHE_KEY.format(
+                    key=cache_key, version=version
+                )
+            lock_key = LOCK_CACHE_KEY.format(key=cache_key)
+
+            # Two tiers: fresh entries are served from process memory until
+            # the version stamp in the shared cache changes.
+            if local:
+                entry = local_cache.get(cache_key, version)
+                if entry is not None and entry.is_fresh(early_refresh_beta):
+                    return entry.data
 
-            if cached_data is not None:
-                return pickle.loads(cached_data)
+            entry = get_cache_entry(cache_key)
+            if entry is not None:
+                if local:
+                    local_cache.set(cache_key, entry, version)
+                if entry.is_fresh(early_refresh_beta):
+                    return entry.data
+                # Stale while revalidate: one caller refreshes the entry in
+                # the background, everyone keeps getting the current value.
+                if cache.add(lock_key, 1, lock):
+                    Thread(
+                        target=refresh_in_background,
+                        args=(cache_key, lock_key, version, *args),
+                        kwargs=kwargs,
+                        daemon=True,
+                    ).start()
+                return entry.data
 
-            data = func(*args, **kwargs)
-            if data is not None:
-                cache.set(cache_key, pickle.dumps(data), timeout)
+            # Single flight: only the lock owner computes the value, the
+            # other callers wait for it to appear in the cache.
+            if not cache.add(lock_key, 1, lock):
+                entry = wait_for_cache_entry(cache_key, lock_key, lock)
+                if entry is not None:
+                    return entry.data
+                # The owner may still be computing: don't release its lock.
+                if not cache.add(lock_key, 1, lock):
+                    lock_key = None
+
+            return refresh(cache_key, lock_key, version, *args, **kwargs)
 
-            return data
         return wrapper
+
+    lock = lock_timeout or settings.CACHE_LOCK_TIMEOUT
+    negative_ttl = (
+        settings.CACHE_NEGATIVE_TTL
+        if negative_timeout is None else negative_timeout
+    )
+    early_refresh_beta = (
+        settings.CACHE_EARLY_REFRESH_BETA if beta is None else beta
+    )
     return decorator
@@ -0,0 +1,141 @@
+# Standard Library
+import logging
+from threading import Lock
+from time import (
+    sleep,
+    time,
+)
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+# Third Party Library
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(settings.PROJECT)
+
+RATE_LIMIT_CACHE_KEY = "RATE_LIMIT_{name}"
+
+# Refills the bucket for the elapsed time and takes the requested tokens
+# only when all of them are available. Returns "<wait>:<remaining>".
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local state = redis.call("HMGET", KEYS[1], "tokens", "timestamp")
+local tokens = tonumber(state[1]) or capacity
+local timestamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - timestamp) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call("HMSET", KEYS[1], "tokens", tokens, "timestamp", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait) .. ":" .. tostring(tokens)
+"""
+
+
+class TokenBucket:
+    def __init__(self, name: str, capacity: int, period: float):
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._lock = Lock()
+        self._tokens = float(capacity)
+        self._timestamp = time()
+        self._script: Optional[Callable[..., Any]] = None
+        self._is_local = False
+
+    @property
+    def cache_key(self) -> str:
+        # The script talks to Redis directly, so the key gets the cache's
+        # prefix and version here.
+        return cache.make_key(RATE_LIMIT_CACHE_KEY.format(name=self.name))
+
+    def acquire(self, tokens: int = 1) -> float:
+        waited = 0.0
+        wait, _ = self._take(tokens)
+        while wait:
+            logger.debug(f"Rate limit '{self.name}': wait {wait:.2f} sec")
+            sleep(wait)
+            waited += wait
+            wait, _ = self._take(tokens)
+        return waited
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        wait, _ = self._take(tokens)
+        return wait
+
+    def remaining(self) -> float:
+        _, tokens = self._take(0)
+        return tokens
+
+    def _take(self, tokens: int) -> Tuple[float, float]:
+        try:
+            result = self._take_shared(tokens)
+        except Exception as exc:
+            if not self._is_local:
+                self._is_local = True
+                logger.warning(
+                    f"Rate limit '{self.name}' falls back to local bucket: "
+                    f"{exc}"
+                )
+            return self._take_local(tokens)
+        if self._is_local:
+            self._is_local = False
+            logger.info(f"Rate limit '{self.name}' uses shared bucket again")
+        return result
+
+    def _take_shared(self, tokens: int) -> Tuple[float, float]:
+        script = self._script
+        if script is None:
+            # Third Party Library
+            from django_redis import get_redis_connection
+            connection = get_redis_connection("default")
+            script = self._script = connection.register_script(
+                TOKEN_BUCKET_SCRIPT
+            )
+        result = script(
+            keys=[self.cache_key],
+            args=[self.capacity, self.rate, time(), tokens],
+        )
+        if isinstance(result, bytes):
+            result = result.decode()
+        wait, remaining = result.split(":")
+        return float(wait), float(remaining)
+
+    def _take_local(self, tokens: int) -> Tuple[float, float]:
+        with self._lock:
+            now = time()
+            elapsed = max(0.0, now - self._timestamp)
+            self._tokens = min(
+                self.capacity, self._tokens + elapsed * self.rate
+            )
+            self._timestamp = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0, self._tokens
+            return (tokens - self._tokens) / self.rate, self._tokens
+
+
+rate_limiters: Dict[str, TokenBucket] = {}
+
+
+def get_rate_limiter(
+        name: str, capacity: int, period: float
+) -> TokenBucket:
+    rate_limiter: Optional[TokenBucket] = rate_limiters.get(name)
+    if rate_limiter is None:
+        rate_limiter = rate_limiters[name] = TokenBucket(
+            name, capacity, period
+        )
+    return rate_limiter
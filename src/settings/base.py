@@ -66,6 +66,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "wsgi.application"
+ASGI_APPLICATION = "asgi.application"
 
 
 # Databases
@@ -106,37 +107,117 @@ if not CACHE_REDIS_LOCATION:
         db=CACHE_REDIS_DATABASE
     )
 
+CACHE_REDIS_OPTIONS = {
+    "CLIENT_CLASS": "django_redis.client.DefaultClient"
+}
+
 CACHE_REDIS = {
     "BACKEND": "django_redis.cache.RedisCache",
     "LOCATION": CACHE_REDIS_LOCATION,
-    "OPTIONS": {
-        "CLIENT_CLASS": "django_redis.client.DefaultClient"
-    },
+    "OPTIONS": CACHE_REDIS_OPTIONS,
     "TIMEOUT": CACHE_REDIS_TIMEOUT
 }
 
 # Caches
 CACHES = {
     "default": CACHE_REDIS,
+    "entries": {
+        **CACHE_REDIS,
+        "OPTIONS": {
+            **CACHE_REDIS_OPTIONS,
+            "SERIALIZER": "cache_serializers.RawSerializer",
+        },
+    },
 }
+CACHE_ENTRIES_ALIAS = "entries"
 
 CACHE_ENABLED = True
 
-TEMPLATES_CACHE_TTL = 60 * 60  # 1 hour
-ANSWERS_LIST_TTL = 60 * 60  # 1 hour
-ORDERS_TTL = 5 * 60  # 5 minutes
+CACHE_LOCK_TIMEOUT = 60  # 1 minute
+CACHE_LOCK_POLL_INTERVAL = 0.1  # 0.1 sec
+CACHE_NEGATIVE_TTL = 30  # 30 sec
+CACHE_EARLY_REFRESH_BETA = 1.0
+CACHE_VERSION_CHECK_INTERVAL = 5  # 5 sec
+LOCAL_CACHE_MAX_SIZE = 128
+CACHE_SERIALIZER = "cache_serializers.CompactSerializer"
+CACHE_COMPRESS_THRESHOLD = 1024  # 1 KB
+CACHE_COMPRESS_LEVEL = 6
+
+# Sheet data is invalidated by the revision watcher bumping the sheet
+# generation, TTLs only bound staleness when the watcher is not running.
+TEMPLATES_CACHE_TTL = 24 * 60 * 60  # 1 day
+TEMPLATES_STALE_TTL = 24 * 60 * 60  # 1 day
+ANSWERS_LIST_TTL = 24 * 60 * 60  # 1 day
+ANSWERS_LIST_STALE_TTL = 24 * 60 * 60  # 1 day
+ORDERS_TTL = 60 * 60  # 1 hour
+ORDERS_STALE_TTL = 60  # 1 minute
+ORDERS_LOCK_TIMEOUT = 60  # 1 minute
+
+# Ingestion
+EVENT_INGEST_BATCH_SIZE = 100
+EVENT_INGEST_FLUSH_INTERVAL = 0.01  # 10 ms
+MESSAGE_MAX_ORDERS = 50
 
 # Workers
-EVENT_WORKER_TIMEOUT = 5  # 5 sec
+EVENT_WORKER_MIN_TIMEOUT = 0.5  # 0.5 sec
+EVENT_WORKER_MAX_TIMEOUT = 30  # 30 sec
+EVENT_WORKER_BATCH_SIZE = int(os.getenv("EVENT_WORKER_BATCH_SIZE", 10))
+EVENT_WORKER_CONCURRENCY = int(os.getenv("EVENT_WORKER_CONCURRENCY", 20))
+EVENT_WORKER_MAX_EVENTS = int(os.getenv("EVENT_WORKER_MAX_EVENTS", 0))
+EVENT_WORKER_MAX_MEMORY = int(os.getenv("EVENT_WORKER_MAX_MEMORY", 0))  # MB
+EVENT_CLAIM_TIMEOUT = 5 * 60  # 5 minutes
+EVENT_HEARTBEAT_INTERVAL = 30  # 30 sec
+# Messages of one chat processed at once, 0 for no limit
+EVENT_CHAT_CONCURRENCY = int(os.getenv("EVENT_CHAT_CONCURRENCY", 0))
+EVENT_MAX_ATTEMPTS = 5
+EVENT_RETRY_BACKOFF = 5  # 5 sec
+EVENT_RETRY_MAX_DELAY = 5 * 60  # 5 minutes
+EVENT_RETENTION_DAYS = int(os.getenv("EVENT_RETENTION_DAYS", 7))
+EVENT_ARCHIVE_BATCH_SIZE = 1000
+
+# Supervisor
+EVENT_SUPERVISOR_MIN_WORKERS = int(os.getenv("EVENT_SUPERVISOR_MIN_WORKERS", 1))
+EVENT_SUPERVISOR_MAX_WORKERS = int(os.getenv("EVENT_SUPERVISOR_MAX_WORKERS", 4))
+EVENT_SUPERVISOR_EVENTS_PER_WORKER = 50
+EVENT_SUPERVISOR_MAX_EVENT_AGE = 30  # 30 sec
+EVENT_SUPERVISOR_INTERVAL = 5  # 5 sec
+EVENT_SUPERVISOR_SCALE_DOWN_DELAY = 60  # 1 minute
+EVENT_SUPERVISOR_STOP_TIMEOUT = 60  # 1 minute
 
 # Telegram
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN", "")
+TELEGRAM_MESSAGE_MAX_LENGTH = 4096
+TELEGRAM_POOL_SIZE = 20
+TELEGRAM_CONNECT_TIMEOUT = 3.05  # 3 sec
+TELEGRAM_READ_TIMEOUT = 10  # 10 sec
+TELEGRAM_MAX_RETRIES = 3
+TELEGRAM_RETRY_BACKOFF = 0.5  # 0.5 sec
+TELEGRAM_RATE_LIMIT = 30  # 30 messages per second for the bot
+TELEGRAM_RATE_LIMIT_PERIOD = 1  # 1 sec
+TELEGRAM_CHAT_RATE_LIMIT = 1  # 1 message per second for every chat
+TELEGRAM_CHAT_RATE_LIMIT_PERIOD = 1  # 1 sec
+TELEGRAM_CHAT_RATE_LIMITERS_CACHE_SIZE = 1000
+TELEGRAM_DISPATCH_BATCH_SIZE = 50
+TELEGRAM_DISPATCH_MAX_ATTEMPTS = 5
 
 # Google API
 KEY_FILE_PATH = f"{os.environ.get('KEY_FILE_PATH', BASE_DIR)}/Creds.json"
-
-# Misc
-ORDER_TIMEOUT = 3  # 3 sec
+GOOGLE_API_RATE_LIMIT = int(os.getenv("GOOGLE_API_RATE_LIMIT", 60))
+GOOGLE_API_RATE_LIMIT_PERIOD = 60  # 1 minute
+GOOGLE_API_POOL_SIZE = int(os.getenv("GOOGLE_API_POOL_SIZE", 20))
+GOOGLE_API_CONNECT_RETRIES = 2
+GOOGLE_API_CIRCUIT_ERROR_RATE = 0.5
+GOOGLE_API_CIRCUIT_MIN_REQUESTS = 10
+GOOGLE_API_CIRCUIT_WINDOW = 60  # 1 minute
+GOOGLE_API_CIRCUIT_OPEN_TIMEOUT = 30  # 30 sec
+GOOGLE_TOKEN_REFRESH_MARGIN = 5 * 60  # 5 minutes
+GOOGLE_TOKEN_LOCK_TIMEOUT = 30  # 30 sec
+GOOGLE_DRIVE_API_URL = os.getenv(
+    "GOOGLE_DRIVE_API_URL", "https://www.googleapis.com/drive/v3"
+)
+SHEET_REVISION_POLL_INTERVAL = 10  # 10 sec
+SHEET_SNAPSHOT_TTL = 60 * 60  # 1 hour
+MATERIALIZER_BATCH_SIZE = 500
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -1,3 +1,7 @@
+# Standard Library
+import os
+
 DOCUMENT_NAME = "Transfercopy"
+DOCUMENT_ID = os.getenv("DOCUMENT_ID")
 SEARCH_SHEET_NAME = "Производство"
 ANSWER_SHEET_NAME = "telegram-bot"